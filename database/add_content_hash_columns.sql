@@ -0,0 +1,8 @@
+-- 同期した値のハッシュを保存するcontent_hashカラムを追加
+-- 既存のテーブルに対して1回だけ実行する（新規作成時はcreate_*_table.sqlに含まれている）
+-- content_hashが変わらない行は同期時のON DUPLICATE KEY UPDATEで書き込まない（last_synced_atも更新しない）
+-- 未適用のまま同期すると、これらのテーブルの同期は開始前にエラーになる
+
+ALTER TABLE companies ADD COLUMN content_hash CHAR(32) NULL COMMENT '同期した値のハッシュ（変更がない行の更新をスキップするため）';
+ALTER TABLE contacts ADD COLUMN content_hash CHAR(32) NULL COMMENT '同期した値のハッシュ（変更がない行の更新をスキップするため）';
+ALTER TABLE deals_purchase ADD COLUMN content_hash CHAR(32) NULL COMMENT '同期した値のハッシュ（変更がない行の更新をスキップするため）';
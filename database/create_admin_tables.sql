@@ -65,4 +65,10 @@ CREATE TABLE IF NOT EXISTS chat_messages (
     FOREIGN KEY (session_id) REFERENCES chat_sessions(id) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='チャットメッセージテーブル';
 
-
+-- スキーマ情報キャッシュテーブル
+CREATE TABLE IF NOT EXISTS schema_cache (
+    id TINYINT PRIMARY KEY COMMENT '常に1（1行のみ保持）',
+    version VARCHAR(64) NOT NULL COMMENT 'スキーマのチェックサム',
+    payload LONGTEXT NOT NULL COMMENT 'AI用の詳細スキーマ情報',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='スキーマ情報キャッシュテーブル';
@@ -61,6 +61,7 @@ CREATE TABLE contacts (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     last_synced_at TIMESTAMP NULL,
+    content_hash CHAR(32) NULL COMMENT '同期した値のハッシュ（変更がない行の更新をスキップするため）',
     INDEX idx_hubspot_id (hubspot_id),
     INDEX idx_last_synced_at (last_synced_at),
     INDEX idx_hubspot_owner_id (hubspot_owner_id),
@@ -2,6 +2,10 @@
 """
 全データ同期スクリプト
 HubSpotから全データを取得してデータベースに同期
+
+使い方:
+    python scripts/sync_all.py         # 差分同期に対応したエンティティは前回以降の更新のみ同期
+    python scripts/sync_all.py --full  # すべて全件同期
 """
 
 import asyncio
@@ -21,6 +25,7 @@ from src.sync.deals_sales_sync import DealsSalesSync
 from src.sync.properties_sync import PropertiesSync
 from src.sync.activities_sync import ActivitiesSync
 from src.database.connection import DatabaseConnection
+from src.hubspot.client import HubSpotBaseClient, hubspot_client
 
 logging.basicConfig(
     level=logging.INFO,
@@ -31,53 +36,57 @@ logger = logging.getLogger(__name__)
 
 async def main():
     """メイン処理"""
-    logger.info("データ同期を開始します...")
+    # --fullを指定した場合は差分同期に対応したエンティティも全件を同期する
+    full_sync = "--full" in sys.argv[1:]
+    logger.info("データ同期を開始します..." + ("（全件同期）" if full_sync else ""))
 
     # データベース接続プールを作成
     await DatabaseConnection.get_pool()
 
     try:
-        # 1. Ownersを先に同期（他のテーブルの外部キーとして必要）
-        logger.info("\n=== Owners同期 ===")
-        owners_sync = OwnersSync()
-        await owners_sync.sync()
-
-        # 2. Companies同期
-        logger.info("\n=== Companies同期 ===")
-        companies_sync = CompaniesSync()
-        await companies_sync.sync()
-
-        # 3. Contacts同期
-        logger.info("\n=== Contacts同期 ===")
-        contacts_sync = ContactsSync()
-        await contacts_sync.sync()
-
-        # 4. Pipeline Stages同期（Deals同期の前に必要）
-        logger.info("\n=== Pipeline Stages同期 ===")
-        pipeline_stages_sync = PipelineStagesSync()
-        await pipeline_stages_sync.sync()
-
-        # 5. Deals Purchase同期
-        logger.info("\n=== Deals Purchase同期 ===")
-        deals_purchase_sync = DealsPurchaseSync()
-        await deals_purchase_sync.sync()
-
-        # 6. Deals Sales同期
-        logger.info("\n=== Deals Sales同期 ===")
-        deals_sales_sync = DealsSalesSync()
-        await deals_sales_sync.sync()
-
-        # 7. Properties同期
-        logger.info("\n=== Properties同期 ===")
-        properties_sync = PropertiesSync()
-        await properties_sync.sync()
-
-        # 8. Activities同期
-        logger.info("\n=== Activities同期 ===")
-        activities_sync = ActivitiesSync()
-        await activities_sync.sync()
-
-        logger.info("\n✅ データ同期が完了しました")
+        # 全エンティティの同期で1つのHubSpot用HTTPクライアントを共有する
+        async with hubspot_client():
+            # 1. Ownersを先に同期（他のテーブルの外部キーとして必要）
+            logger.info("\n=== Owners同期 ===")
+            owners_sync = OwnersSync()
+            await owners_sync.sync()
+
+            # 2. Companies同期
+            logger.info("\n=== Companies同期 ===")
+            companies_sync = CompaniesSync()
+            await companies_sync.sync(full_sync=full_sync)
+
+            # 3. Contacts同期
+            logger.info("\n=== Contacts同期 ===")
+            contacts_sync = ContactsSync()
+            await contacts_sync.sync(full_sync=full_sync)
+
+            # 4. Pipeline Stages同期（Deals同期の前に必要）
+            logger.info("\n=== Pipeline Stages同期 ===")
+            pipeline_stages_sync = PipelineStagesSync()
+            await pipeline_stages_sync.sync()
+
+            # 5. Deals Purchase同期
+            logger.info("\n=== Deals Purchase同期 ===")
+            deals_purchase_sync = DealsPurchaseSync()
+            await deals_purchase_sync.sync(full_sync=full_sync)
+
+            # 6. Deals Sales同期
+            logger.info("\n=== Deals Sales同期 ===")
+            deals_sales_sync = DealsSalesSync()
+            await deals_sales_sync.sync()
+
+            # 7. Properties同期
+            logger.info("\n=== Properties同期 ===")
+            properties_sync = PropertiesSync()
+            await properties_sync.sync()
+
+            # 8. Activities同期
+            logger.info("\n=== Activities同期 ===")
+            activities_sync = ActivitiesSync()
+            await activities_sync.sync()
+
+            logger.info("\n✅ データ同期が完了しました")
 
     except Exception as e:
         logger.error(f"❌ データ同期エラー: {str(e)}")
@@ -85,6 +94,7 @@ async def main():
 
     finally:
         # 接続プールを閉じる
+        await HubSpotBaseClient.close_http_client()
         await DatabaseConnection.close_pool()
 
 
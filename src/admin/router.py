@@ -3,11 +3,11 @@
 """
 import os
 from fastapi import APIRouter, Request, Depends
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from typing import Optional, List
-from src.middleware.auth import get_current_user, require_login, require_admin
+from src.middleware.auth import get_current_user, CurrentUser, require_admin
 from src.api.api_keys import api_key_manager
 from src.database.connection import DatabaseConnection
 
@@ -16,8 +16,7 @@ templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), ".
 
 
 @router.get("/dashboard", response_class=HTMLResponse)
-@require_login
-async def dashboard(request: Request, user: dict = None):
+async def dashboard(request: Request, user: CurrentUser):
     """ダッシュボード"""
     return templates.TemplateResponse(
         "dashboard.html",
@@ -26,13 +25,8 @@ async def dashboard(request: Request, user: dict = None):
 
 
 @router.get("/api-keys", response_class=HTMLResponse)
-@require_login
-async def api_keys_page(request: Request, user: dict = None):
+async def api_keys_page(request: Request, user: CurrentUser):
     """APIキー管理ページ"""
-    if not user or 'id' not in user:
-        from fastapi.responses import RedirectResponse
-        return RedirectResponse(url="/auth/login")
-    
     # APIキー一覧を取得
     keys = await api_key_manager.list_api_keys(user['id'])
     
@@ -53,19 +47,12 @@ class CreateAPIKeyRequest(BaseModel):
 
 
 @router.post("/api-keys/create")
-@require_login
 async def create_api_key(
     request: Request,
     api_key_request: CreateAPIKeyRequest,
-    user: dict = None
+    user: CurrentUser
 ):
     """APIキーを作成"""
-    if not user or 'id' not in user:
-        return JSONResponse(
-            status_code=401,
-            content={"error": "認証が必要です"}
-        )
-    
     try:
         result = await api_key_manager.create_api_key(
             user_id=user['id'],
@@ -82,19 +69,12 @@ async def create_api_key(
 
 
 @router.delete("/api-keys/{api_key_id}")
-@require_login
 async def delete_api_key(
     request: Request,
     api_key_id: int,
-    user: dict = None
+    user: CurrentUser
 ):
     """APIキーを削除"""
-    if not user or 'id' not in user:
-        return JSONResponse(
-            status_code=401,
-            content={"error": "認証が必要です"}
-        )
-    
     try:
         success = await api_key_manager.delete_api_key(api_key_id, user['id'])
         if success:
@@ -112,19 +92,12 @@ async def delete_api_key(
 
 
 @router.post("/api-keys/{api_key_id}/toggle")
-@require_login
 async def toggle_api_key(
     request: Request,
     api_key_id: int,
-    user: dict = None
+    user: CurrentUser
 ):
     """APIキーの有効/無効を切り替え"""
-    if not user or 'id' not in user:
-        return JSONResponse(
-            status_code=401,
-            content={"error": "認証が必要です"}
-        )
-    
     try:
         success = await api_key_manager.toggle_api_key(api_key_id, user['id'])
         if success:
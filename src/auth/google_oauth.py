@@ -8,6 +8,7 @@ from authlib.integrations.starlette_client import OAuth
 from starlette.requests import Request
 from starlette.responses import RedirectResponse
 from src.database.connection import DatabaseConnection
+from src.middleware.auth import invalidate_user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +86,7 @@ async def get_or_create_user(profile: Dict[str, Any]) -> Optional[Dict[str, Any]
                     (owner_id, name, picture, user['id'])
                 )
                 await conn.commit()
+                invalidate_user_cache(user['id'])
                 
                 # 更新後のユーザー情報を取得
                 await cursor.execute(
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Request, Depends
 from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
 from src.auth.google_oauth import google_login, google_callback
-from src.middleware.auth import get_current_user, require_login
+from src.middleware.auth import get_current_user, invalidate_user_cache
 from src.database.connection import DatabaseConnection
 import os
 
@@ -47,6 +47,7 @@ async def auth_google_callback(request: Request):
 @router.get("/logout")
 async def logout(request: Request):
     """ログアウト"""
+    invalidate_user_cache(request.session.get('user_id'))
     request.session.clear()
     return RedirectResponse(url="/auth/login")
 
@@ -1,6 +1,7 @@
 """
 データベース分析機能
 """
+import hashlib
 import logging
 import re
 from typing import Dict, Any, List, Optional
@@ -8,6 +9,9 @@ from src.database.connection import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
+# get_detailed_database_schemaの出力形式を変更した場合は更新する（スキーマキャッシュの無効化用）
+SCHEMA_FORMAT_VERSION = "1"
+
 
 class DatabaseAnalyzer:
     """データベース分析クラス"""
@@ -360,6 +364,90 @@ class DatabaseAnalyzer:
             logger.error(f"詳細スキーマ取得エラー: {str(e)}", exc_info=True)
             return f"詳細スキーマ情報の取得に失敗しました: {str(e)}"
     
+    @staticmethod
+    async def get_schema_checksum() -> Optional[str]:
+        """
+        スキーマ情報のチェックサムを取得
+
+        詳細スキーマの生成に使うテーブル・カラム・外部キー情報を3クエリでまとめて取得し、
+        MD5でハッシュ化する。
+
+        Returns:
+            チェックサム（取得に失敗した場合はNone）
+        """
+        try:
+            async with DatabaseConnection.get_cursor() as (cursor, conn):
+                digest = hashlib.md5(SCHEMA_FORMAT_VERSION.encode("utf-8"))
+                for sql in (
+                    """
+                    SELECT TABLE_NAME, TABLE_COMMENT
+                    FROM INFORMATION_SCHEMA.TABLES
+                    WHERE TABLE_SCHEMA = DATABASE()
+                    ORDER BY TABLE_NAME
+                    """,
+                    """
+                    SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_COMMENT
+                    FROM INFORMATION_SCHEMA.COLUMNS
+                    WHERE TABLE_SCHEMA = DATABASE()
+                    ORDER BY TABLE_NAME, ORDINAL_POSITION
+                    """,
+                    """
+                    SELECT TABLE_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+                    FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+                    WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL
+                    ORDER BY TABLE_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+                    """
+                ):
+                    await cursor.execute(sql)
+                    for row in await cursor.fetchall():
+                        digest.update(repr(tuple(row.values())).encode("utf-8"))
+                return digest.hexdigest()
+        except Exception as e:
+            logger.warning(f"スキーマチェックサム取得エラー: {str(e)}")
+            return None
+
+    @staticmethod
+    async def get_cached_detailed_schema(version: str) -> Optional[str]:
+        """
+        schema_cacheテーブルから詳細スキーマ情報を取得
+
+        Args:
+            version: 現在のスキーマのチェックサム
+
+        Returns:
+            チェックサムが一致する場合は保存済みのスキーマ情報、それ以外はNone
+        """
+        try:
+            async with DatabaseConnection.get_cursor() as (cursor, conn):
+                await cursor.execute(
+                    "SELECT payload FROM schema_cache WHERE id = 1 AND version = %s",
+                    (version,)
+                )
+                row = await cursor.fetchone()
+                return row["payload"] if row else None
+        except Exception as e:
+            logger.warning(f"スキーマキャッシュ取得エラー: {str(e)}")
+            return None
+
+    @staticmethod
+    async def save_cached_detailed_schema(version: str, payload: str) -> None:
+        """詳細スキーマ情報をschema_cacheテーブルに保存"""
+        try:
+            async with DatabaseConnection.get_cursor() as (cursor, conn):
+                await cursor.execute(
+                    """
+                    INSERT INTO schema_cache (id, version, payload)
+                    VALUES (1, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        version = VALUES(version),
+                        payload = VALUES(payload)
+                    """,
+                    (version, payload)
+                )
+                await conn.commit()
+        except Exception as e:
+            logger.warning(f"スキーマキャッシュ保存エラー: {str(e)}")
+
     @staticmethod
     async def execute_query(sql: str, max_rows: int = 1000) -> Dict[str, Any]:
         """
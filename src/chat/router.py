@@ -10,7 +10,7 @@ from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from typing import Optional, List, AsyncGenerator, Dict, Any
-from src.middleware.auth import get_current_user, require_login
+from src.middleware.auth import get_current_user, CurrentUser
 from src.chat.service import ChatService
 
 logger = logging.getLogger(__name__)
@@ -49,8 +49,7 @@ class ChatMessageResponse(BaseModel):
 
 
 @router.get("/", response_class=HTMLResponse)
-@require_login
-async def chat_page(request: Request, user: dict = None):
+async def chat_page(request: Request, user: CurrentUser):
     """チャットページ"""
     return templates.TemplateResponse(
         "chat.html",
@@ -62,10 +61,9 @@ async def chat_page(request: Request, user: dict = None):
 
 
 @router.get("/sessions")
-@require_login
 async def get_sessions(
     request: Request,
-    user: dict = None
+    user: CurrentUser
 ):
     """チャットセッション一覧を取得（ログインユーザーのみ）"""
     try:
@@ -93,11 +91,10 @@ async def get_sessions(
 
 
 @router.get("/sessions/{session_id}/messages")
-@require_login
 async def get_messages(
     request: Request,
     session_id: int,
-    user: dict = None
+    user: CurrentUser
 ):
     """チャットメッセージ一覧を取得"""
     try:
@@ -215,10 +212,9 @@ async def send_message_stream(
 
 
 @router.post("/sessions/new")
-@require_login
 async def create_session(
     request: Request,
-    user: dict = None
+    user: CurrentUser
 ):
     """新しいチャットセッションを作成"""
     try:
@@ -236,11 +232,10 @@ async def create_session(
 
 
 @router.delete("/sessions/{session_id}")
-@require_login
 async def delete_session(
     request: Request,
     session_id: int,
-    user: dict = None
+    user: CurrentUser
 ):
     """チャットセッションを削除"""
     import logging
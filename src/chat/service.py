@@ -19,6 +19,17 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# 挨拶・お礼などの定型文（メッセージを句読点で区切った各部分がすべてこれらの場合はベクトルDB検索をスキップ）
+# 「すみません、今月の件数を教えて」のように定型文に質問が続く場合はスキップしない
+_FILLER_PHRASES = frozenset((
+    'ありがとう', 'ありがとうございます', 'ありがとうございました', '助かります', '助かりました',
+    'おはよう', 'おはようございます', 'こんにちは', 'こんばんは',
+    'おつかれさま', 'おつかれさまです', 'お疲れ様', 'お疲れ様です', 'お疲れさまです', 'お疲れ様でした',
+    '了解', '了解です', '了解しました', 'わかりました', 'すみません'
+))
+# 定型文の判定でメッセージを区切る句読点・記号・空白
+_FILLER_SEPARATORS = re.compile(r'[。、．，.,!！?？〜ー～\s]+')
+
 
 class ChatService:
     """チャットサービスクラス"""
@@ -51,16 +62,36 @@ class ChatService:
             logger.warning(f"VectorStoreの初期化に失敗（オプション機能）: {str(e)}")
     
     @staticmethod
-    async def load_database_schema():
-        """データベーススキーマ情報をロードしてキャッシュに保存"""
+    async def load_database_schema() -> bool:
+        """
+        データベーススキーマ情報をロードしてキャッシュに保存
+
+        schema_cacheテーブルのチェックサムが現在のスキーマと一致する場合は、
+        保存済みのスキーマ情報を使用して詳細スキーマの再取得を省略する。
+
+        Returns:
+            スキーマ情報を新たに生成した場合True（保存済みの情報を使用した場合・失敗した場合はFalse）
+        """
         logger.info("データベーススキーマ情報をロード中...")
         try:
+            version = await DatabaseAnalyzer.get_schema_checksum()
+            if version:
+                cached_schema = await DatabaseAnalyzer.get_cached_detailed_schema(version)
+                if cached_schema:
+                    ChatService._schema_cache = cached_schema
+                    logger.info(f"スキーマに変更がないため保存済みのスキーマ情報を使用します (version: {version})")
+                    return False
+
             schema_info = await DatabaseAnalyzer.get_detailed_database_schema()
             ChatService._schema_cache = schema_info
+            if version and not schema_info.startswith("詳細スキーマ情報の取得に失敗しました"):
+                await DatabaseAnalyzer.save_cached_detailed_schema(version, schema_info)
             logger.info("データベーススキーマ情報のロードが完了しました")
+            return True
         except Exception as e:
             logger.error(f"データベーススキーマ情報のロードに失敗: {str(e)}")
             ChatService._schema_cache = "スキーマ情報がロードできませんでした"
+            return False
     
     @staticmethod
     def get_cached_schema() -> str:
@@ -1252,8 +1283,15 @@ SQLクエリは表示しないでください。分析結果のみを返して
         Returns:
             検索を実行すべき場合はTrue、スキップすべき場合はFalse
         """
+        # 定型の挨拶・お礼だけで構成されるメッセージは長さにかかわらずスキップ
+        # （「ありがとうございます！助かりました」など）
+        stripped = message.strip()
+        segments = [segment for segment in _FILLER_SEPARATORS.split(stripped) if segment]
+        if segments and all(segment in _FILLER_PHRASES for segment in segments):
+            return False
+        
         # メッセージが短すぎる場合はスキップ（挨拶など）
-        if len(message.strip()) < 10:
+        if len(stripped) < 10:
             return False
         
         # データベース関連のキーワードを定義
@@ -2,8 +2,12 @@
 ベクトルDB管理
 """
 import os
+import time
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -20,17 +24,58 @@ except (ImportError, RuntimeError) as e:
     CHROMADB_AVAILABLE = False
 
 try:
-    import ollama
+    import httpx
     OLLAMA_AVAILABLE = True
 except ImportError:
-    logger.warning("Ollamaのインポートに失敗しました（オプション機能）")
-    ollama = None
+    logger.warning("httpxのインポートに失敗しました（Ollamaエンベディングは無効化されます）")
+    httpx = None
     OLLAMA_AVAILABLE = False
 
+# orjsonがあればエンベディングのJSON変換に使用（768次元のfloat配列はstdlib jsonだと遅い）
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    _json_loads = json.loads
+
+# これより短いメッセージは検索価値がないためエンベディングしない（MySQLには保存済み）
+MIN_EMBED_MESSAGE_LENGTH = 8
+
+# 相槌・挨拶など検索価値のない定型メッセージ
+TRIVIAL_RESPONSES = frozenset({
+    'はい', 'いいえ', 'OK', 'ok', 'Ok', '了解', '了解です', '了解しました', 'わかりました',
+    'ありがとう', 'ありがとうございます', 'ありがとうございました', 'よろしくお願いします',
+    'お願いします', 'こんにちは', 'こんばんは', 'おはようございます', 'すみません',
+})
+
+# 同一セッション・同一ロール・同一内容のメッセージを重複とみなす時間（秒）
+DUPLICATE_WINDOW_SECONDS = 5.0
+DUPLICATE_CACHE_SIZE = 1024
+
+# query時のデフォルトinclude（呼び出し側で不要なフィールドを省略できる）
+DEFAULT_QUERY_INCLUDE = ['documents', 'metadatas', 'distances']
+
 
 class VectorStore:
     """ベクトルDB管理クラス"""
     
+    # 直近に追加したチャットメッセージ（重複排除用、インスタンス間で共有）
+    _recent_chat_messages: "OrderedDict[Tuple[int, str, str], float]" = OrderedDict()
+    _recent_chat_lock = threading.Lock()
+    
+    # エンベディング取得用HTTPクライアント（インスタンス間で共有し、アプリ終了時に閉じる）
+    _embedding_client: Optional["httpx.Client"] = None
+    _embedding_client_lock = threading.Lock()
+    
     def __init__(self):
         self.chroma_host = os.getenv('CHROMA_HOST', 'chroma')
         self.chroma_port = int(os.getenv('CHROMA_PORT', '8000'))
@@ -111,16 +156,47 @@ class VectorStore:
             return None
         
         try:
-            client = ollama.Client(host=self.ollama_host)
-            response = client.embeddings(
-                model=self.embedding_model,
-                prompt=text
+            # Ollama /api/embeddings を直接呼び出し、JSONの変換はorjson（利用可能な場合）で行う
+            response = self._get_embedding_client().post(
+                "/api/embeddings",
+                content=_json_dumps({"model": self.embedding_model, "prompt": text}),
+                headers={"Content-Type": "application/json"}
             )
-            return response.get('embedding')
+            response.raise_for_status()
+            return _json_loads(response.content).get('embedding')
         except Exception as e:
             logger.error(f"エンベディング取得エラー: {str(e)}", exc_info=True)
             return None
     
+    def _get_embedding_client(self) -> "httpx.Client":
+        """共有のエンベディング取得用HTTPクライアントを取得（初回に作成し、以降は接続を使い回す）"""
+        cls = VectorStore
+        with cls._embedding_client_lock:
+            if cls._embedding_client is None or cls._embedding_client.is_closed:
+                cls._embedding_client = httpx.Client(base_url=self.ollama_host, timeout=60.0)
+            return cls._embedding_client
+    
+    @classmethod
+    def close_embedding_client(cls):
+        """共有のエンベディング取得用HTTPクライアントを閉じる"""
+        with cls._embedding_client_lock:
+            if cls._embedding_client is not None:
+                cls._embedding_client.close()
+                cls._embedding_client = None
+    
+    @classmethod
+    def _is_duplicate_chat_message(cls, session_id: int, role: str, content: str) -> bool:
+        """同一セッション・ロール・内容のメッセージが直近に追加済みかを判定（未登録なら記録する）"""
+        key = (session_id, role, hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest())
+        now = time.monotonic()
+        with cls._recent_chat_lock:
+            last_added = cls._recent_chat_messages.get(key)
+            cls._recent_chat_messages[key] = now
+            cls._recent_chat_messages.move_to_end(key)
+            while len(cls._recent_chat_messages) > DUPLICATE_CACHE_SIZE:
+                cls._recent_chat_messages.popitem(last=False)
+        return last_added is not None and now - last_added < DUPLICATE_WINDOW_SECONDS
+    
     def add_chat_message(
         self,
         session_id: int,
@@ -140,6 +216,16 @@ class VectorStore:
         if not self.chat_collection:
             return
         
+        # 短いメッセージや定型の相槌は検索価値がないためスキップ
+        stripped = content.strip()
+        if len(stripped) < MIN_EMBED_MESSAGE_LENGTH or stripped in TRIVIAL_RESPONSES:
+            logger.debug(f"短い・定型メッセージのためベクトルDBへの追加をスキップ: session_id={session_id}")
+            return
+        
+        if self._is_duplicate_chat_message(session_id, role, stripped):
+            logger.debug(f"直前と同じメッセージのためベクトルDBへの追加をスキップ: session_id={session_id}")
+            return
+        
         try:
             # エンベディングを取得
             embedding = self.get_embedding(content)
@@ -200,14 +286,7 @@ class VectorStore:
             }
             
             # ベクトルDBに追加（既存の場合は更新）
-            try:
-                self.db_info_collection.get(ids=[doc_id])
-                # 既存の場合は削除して再追加
-                self.db_info_collection.delete(ids=[doc_id])
-            except:
-                pass
-            
-            self.db_info_collection.add(
+            self.db_info_collection.upsert(
                 ids=[doc_id],
                 embeddings=[embedding],
                 documents=[text],
@@ -217,11 +296,32 @@ class VectorStore:
         except Exception as e:
             logger.error(f"データベース情報追加エラー: {str(e)}", exc_info=True)
     
+    @staticmethod
+    def _iter_query_results(results: Dict[str, Any]):
+        """
+        query結果を1件ずつ (index, document, metadata, distance) で返す
+        
+        includeで省略されたフィールドは None（metadataは空dict）になる。
+        idsは常に返却されるため、件数の基準にはidsを使用する。
+        """
+        ids = results.get('ids') or [[]]
+        documents = (results.get('documents') or [None])[0]
+        metadatas = (results.get('metadatas') or [None])[0]
+        distances = (results.get('distances') or [None])[0]
+        for i in range(len(ids[0])):
+            yield (
+                i,
+                documents[i] if documents else None,
+                (metadatas[i] if metadatas else None) or {},
+                distances[i] if distances else None
+            )
+    
     def search_similar_messages(
         self,
         query: str,
         session_id: Optional[int] = None,
-        limit: int = 5
+        limit: int = 5,
+        include: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         類似するチャットメッセージを検索
@@ -230,6 +330,7 @@ class VectorStore:
             query: 検索クエリ
             session_id: セッションID（指定した場合、そのセッションのみ検索）
             limit: 返却件数
+            include: ChromaDBから取得するフィールド（省略時はdocuments/metadatas/distances）
             
         Returns:
             類似メッセージのリスト
@@ -252,20 +353,19 @@ class VectorStore:
             results = self.chat_collection.query(
                 query_embeddings=[query_embedding],
                 n_results=limit,
-                where=where if where else None
+                where=where if where else None,
+                include=include if include is not None else DEFAULT_QUERY_INCLUDE
             )
             
-            # 結果を整形
+            # 結果を整形（includeで省略されたフィールドはNone）
             messages = []
-            if results.get('documents') and len(results['documents']) > 0:
-                for i, doc in enumerate(results['documents'][0]):
-                    metadata = results['metadatas'][0][i] if results.get('metadatas') else {}
-                    messages.append({
-                        "content": doc,
-                        "session_id": metadata.get("session_id"),
-                        "role": metadata.get("role"),
-                        "distance": results['distances'][0][i] if results.get('distances') else None
-                    })
+            for i, doc, metadata, distance in self._iter_query_results(results):
+                messages.append({
+                    "content": doc,
+                    "session_id": metadata.get("session_id"),
+                    "role": metadata.get("role"),
+                    "distance": distance
+                })
             
             return messages
         except Exception as e:
@@ -275,7 +375,8 @@ class VectorStore:
     def search_similar_database_info(
         self,
         query: str,
-        limit: int = 5
+        limit: int = 5,
+        include: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         類似するデータベース情報を検索
@@ -283,6 +384,7 @@ class VectorStore:
         Args:
             query: 検索クエリ
             limit: 返却件数
+            include: ChromaDBから取得するフィールド（省略時はdocuments/metadatas/distances）
             
         Returns:
             類似データベース情報のリスト
@@ -299,19 +401,18 @@ class VectorStore:
             # 類似情報を検索
             results = self.db_info_collection.query(
                 query_embeddings=[query_embedding],
-                n_results=limit
+                n_results=limit,
+                include=include if include is not None else DEFAULT_QUERY_INCLUDE
             )
             
-            # 結果を整形
+            # 結果を整形（includeで省略されたフィールドはNone）
             infos = []
-            if results.get('documents') and len(results['documents']) > 0:
-                for i, doc in enumerate(results['documents'][0]):
-                    metadata = results['metadatas'][0][i] if results.get('metadatas') else {}
-                    infos.append({
-                        "content": doc,
-                        "table_name": metadata.get("table_name"),
-                        "distance": results['distances'][0][i] if results.get('distances') else None
-                    })
+            for i, doc, metadata, distance in self._iter_query_results(results):
+                infos.append({
+                    "content": doc,
+                    "table_name": metadata.get("table_name"),
+                    "distance": distance
+                })
             
             return infos
         except Exception as e:
@@ -321,7 +422,8 @@ class VectorStore:
     def search_business_data(
         self,
         query: str,
-        limit: int = 10
+        limit: int = 10,
+        include: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         類似するビジネスデータを検索
@@ -329,6 +431,7 @@ class VectorStore:
         Args:
             query: 検索クエリ
             limit: 返却件数
+            include: ChromaDBから取得するフィールド（省略時はdocuments/metadatas/distances）
             
         Returns:
             類似ビジネスデータのリスト
@@ -343,25 +446,59 @@ class VectorStore:
             
             results = self.business_data_collection.query(
                 query_embeddings=[query_embedding],
-                n_results=limit
+                n_results=limit,
+                include=include if include is not None else DEFAULT_QUERY_INCLUDE
             )
             
             data = []
-            if results.get('documents') and len(results['documents']) > 0:
-                for i, doc in enumerate(results['documents'][0]):
-                    metadata = results['metadatas'][0][i] if results.get('metadatas') else {}
-                    data.append({
-                        "content": doc,
-                        "table": metadata.get("type"),
-                        "mysql_id": metadata.get("id"),
-                        "owner_id": metadata.get("owner_id"),
-                        "distance": results['distances'][0][i] if results.get('distances') else None
-                    })
+            for i, doc, metadata, distance in self._iter_query_results(results):
+                data.append({
+                    "content": doc,
+                    "table": metadata.get("type"),
+                    "mysql_id": metadata.get("id"),
+                    "owner_id": metadata.get("owner_id"),
+                    "distance": distance
+                })
             return data
         except Exception as e:
             logger.error(f"ビジネスデータ検索エラー: {str(e)}", exc_info=True)
             return []
     
+    @staticmethod
+    def _build_where_filter(
+        type_filter: Optional[str] = None,
+        owner_id: Optional[int] = None,
+        **kwargs
+    ) -> Optional[Dict[str, Any]]:
+        """メタデータ条件からChromaDBのwhereフィルタを構築（複数条件は$and演算子）"""
+        where_conditions = []
+        if type_filter:
+            where_conditions.append({"type": type_filter})
+        if owner_id is not None:
+            where_conditions.append({"owner_id": owner_id})
+        # その他のフィルタを追加
+        for key, value in kwargs.items():
+            if value is not None:
+                where_conditions.append({key: value})
+        
+        if len(where_conditions) == 0:
+            return None
+        if len(where_conditions) == 1:
+            return where_conditions[0]
+        return {"$and": where_conditions}
+    
+    def _count_where(self, where_filter: Optional[Dict[str, Any]]) -> int:
+        """
+        whereフィルタに一致するビジネスデータの件数を取得
+        
+        件数のみ必要なため include=[] でIDだけを取得する（エンベディング・ドキュメントは転送しない）。
+        limit=100000 のような大きな値を指定するのは不要で、limitを省略すれば全件が対象になる。
+        """
+        if where_filter is None:
+            return self.business_data_collection.count()
+        results = self.business_data_collection.get(where=where_filter, include=[])
+        return len(results.get('ids', []))
+    
     def count_business_data_by_metadata(
         self,
         type_filter: Optional[str] = None,
@@ -383,33 +520,8 @@ class VectorStore:
             return 0
         
         try:
-            # フィルタ条件を構築（ChromaDBの$and演算子を使用）
-            where_conditions = []
-            if type_filter:
-                where_conditions.append({"type": type_filter})
-            if owner_id is not None:
-                where_conditions.append({"owner_id": owner_id})
-            # その他のフィルタを追加
-            for key, value in kwargs.items():
-                if value is not None:
-                    where_conditions.append({key: value})
-            
-            # フィルタ条件を適用
-            if len(where_conditions) == 0:
-                where_filter = None
-            elif len(where_conditions) == 1:
-                where_filter = where_conditions[0]
-            else:
-                # 複数条件の場合は$and演算子を使用
-                where_filter = {"$and": where_conditions}
-            
-            # メタデータでフィルタリングして取得（limitを大きく設定）
-            results = self.business_data_collection.get(
-                where=where_filter,
-                limit=100000  # 実質的に全件取得
-            )
-            
-            return len(results.get('documents', []))
+            where_filter = self._build_where_filter(type_filter, owner_id, **kwargs)
+            return self._count_where(where_filter)
         except Exception as e:
             logger.error(f"ビジネスデータカウントエラー: {str(e)}", exc_info=True)
             return 0
@@ -437,43 +549,22 @@ class VectorStore:
             return 0
         
         try:
-            # フィルタ条件を構築（ChromaDBの$and演算子を使用）
-            where_conditions = []
-            if type_filter:
-                where_conditions.append({"type": type_filter})
-            if owner_id is not None:
-                where_conditions.append({"owner_id": owner_id})
-            # その他のフィルタを追加
-            for key, value in kwargs.items():
-                if value is not None:
-                    where_conditions.append({key: value})
+            where_filter = self._build_where_filter(type_filter, owner_id, **kwargs)
             
-            # フィルタ条件を適用
-            if len(where_conditions) == 0:
-                where_filter = None
-            elif len(where_conditions) == 1:
-                where_filter = where_conditions[0]
-            else:
-                # 複数条件の場合は$and演算子を使用
-                where_filter = {"$and": where_conditions}
+            if not text_contains:
+                return self._count_where(where_filter)
             
-            # メタデータでフィルタリングして取得（limitを大きく設定）
+            # テキストフィルタが指定されている場合のみドキュメントを取得してフィルタリング
+            # （limitを省略するとChromaDBは該当する全件を返す）
             results = self.business_data_collection.get(
                 where=where_filter,
-                limit=100000  # 実質的に全件取得
+                include=['documents']
             )
-            
-            documents = results.get('documents', [])
-            
-            # テキストフィルタが指定されている場合は、さらにフィルタリング
-            if text_contains:
-                count = 0
-                for doc in documents:
-                    if text_contains in doc:
-                        count += 1
-                return count
-            
-            return len(documents)
+            count = 0
+            for doc in results.get('documents') or []:
+                if doc and text_contains in doc:
+                    count += 1
+            return count
         except Exception as e:
             logger.error(f"ビジネスデータカウントエラー（テキストフィルタ）: {str(e)}", exc_info=True)
             return 0
@@ -2,52 +2,133 @@
 データベース接続管理
 """
 import os
-import aiomysql
+import asyncio
+import inspect
 import logging
-from typing import Optional
+from typing import Any, Optional
 from contextlib import asynccontextmanager
 
+# 既定はaiomysql。MYSQL_DRIVER=asyncmyの場合のみasyncmy（Cython実装）を使用する
+# （asyncmyは本番環境で未検証のため明示的に指定した場合に限る。別途pip install asyncmyが必要）
+DB_DRIVER = os.getenv("MYSQL_DRIVER", "aiomysql")
+if DB_DRIVER == "asyncmy":
+    import asyncmy
+    from asyncmy.cursors import DictCursor, SSDictCursor
+else:
+    DB_DRIVER = "aiomysql"
+    import aiomysql
+    from aiomysql import DictCursor, SSDictCursor
+
 logger = logging.getLogger(__name__)
 
+# 接続取得の待ち時間の上限（秒）。プールが枯渇した場合に無期限に待たないようにする
+ACQUIRE_TIMEOUT = float(os.getenv("MYSQL_ACQUIRE_TIMEOUT", "10"))
+
+# 接続プールの最大接続数
+POOL_MAXSIZE = 10
+
+# 起動時に事前に確立しておく接続数
+POOL_PREWARM_SIZE = int(os.getenv("MYSQL_POOL_PREWARM", "4"))
+
+
+async def _release(pool, conn) -> None:
+    """接続をプールに戻す（ドライバーによってreleaseが返す待機可能オブジェクトも待つ）"""
+    result = pool.release(conn)
+    if inspect.isawaitable(result):
+        await result
+
+
+def _release_if_acquired(pool, task: "asyncio.Future") -> None:
+    """タイムアウト後に取得が完了していた接続をプールに戻す"""
+    if not task.cancelled() and task.exception() is None:
+        asyncio.ensure_future(_release(pool, task.result()))
+
+
+async def _acquire(pool, timeout: Optional[float]):
+    """
+    タイムアウト付きで接続を取得
+
+    asyncio.wait_forはタイムアウトと取得完了が競合すると、取得済みの接続を返さずに
+    破棄してしまう。取得をタスクとして分離し、タイムアウト・キャンセル時は取得を中止したうえで、
+    すでに取得できていた接続はプールに戻す。
+    """
+    if timeout is None:
+        return await pool.acquire()
+    task = asyncio.ensure_future(pool.acquire())
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        task.cancel()
+        task.add_done_callback(lambda done: _release_if_acquired(pool, done))
+        raise
+
 
 class DatabaseConnection:
     """データベース接続管理クラス"""
     
-    _pool: Optional[aiomysql.Pool] = None
+    _pool: Optional[Any] = None
     
     @classmethod
-    async def get_pool(cls) -> aiomysql.Pool:
+    async def get_pool(cls):
         """接続プールを取得（シングルトン）"""
         if cls._pool is None:
-            cls._pool = await aiomysql.create_pool(
+            params = dict(
                 host=os.getenv("MYSQL_HOST", "mysql"),
                 port=int(os.getenv("MYSQL_PORT", "3306")),
                 user=os.getenv("MYSQL_USER", "mirai_user"),
                 password=os.getenv("MYSQL_PASSWORD", "mirai_password"),
-                db=os.getenv("MYSQL_DATABASE", "mirai_ai"),
                 charset=os.getenv("MYSQL_CHARSET", "utf8mb4"),
                 autocommit=False,
                 minsize=1,
-                maxsize=10
+                maxsize=POOL_MAXSIZE
             )
-            logger.info("Database connection pool created")
+            database = os.getenv("MYSQL_DATABASE", "mirai_ai")
+            if DB_DRIVER == "asyncmy":
+                cls._pool = await asyncmy.create_pool(database=database, **params)
+            else:
+                cls._pool = await aiomysql.create_pool(db=database, **params)
+            logger.info(f"Database connection pool created ({DB_DRIVER})")
         return cls._pool
     
+    @classmethod
+    async def prewarm(cls, size: int = POOL_PREWARM_SIZE):
+        """接続プールに事前に接続を確立しておく（起動直後のリクエストで接続確立を待たないようにする）"""
+        pool = await cls.get_pool()
+        size = min(size, POOL_MAXSIZE)
+
+        async def warm(conn):
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT 1")
+
+        # 同時に取得することでsize本の接続を確立させ、解放後はプールに保持される
+        conns = await asyncio.gather(
+            *(_acquire(pool, ACQUIRE_TIMEOUT) for _ in range(size)),
+            return_exceptions=True
+        )
+        acquired = [conn for conn in conns if not isinstance(conn, BaseException)]
+        try:
+            await asyncio.gather(*(warm(conn) for conn in acquired))
+        finally:
+            await asyncio.gather(*(_release(pool, conn) for conn in acquired))
+        logger.info(f"Database connection pool prewarmed ({len(acquired)}/{size} connections)")
+    
     @classmethod
     @asynccontextmanager
-    async def get_connection(cls):
+    async def get_connection(cls, timeout: Optional[float] = ACQUIRE_TIMEOUT):
         """データベース接続を取得（コンテキストマネージャー）"""
         pool = await cls.get_pool()
-        async with pool.acquire() as conn:
+        conn = await _acquire(pool, timeout)
+        try:
             yield conn
+        finally:
+            await _release(pool, conn)
     
     @classmethod
     @asynccontextmanager
-    async def get_cursor(cls):
+    async def get_cursor(cls, timeout: Optional[float] = ACQUIRE_TIMEOUT):
         """カーソルを取得（コンテキストマネージャー）"""
-        pool = await cls.get_pool()
-        async with pool.acquire() as conn:
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
+        async with cls.get_connection(timeout) as conn:
+            async with conn.cursor(DictCursor) as cursor:
                 yield cursor, conn
     
     @classmethod
@@ -1,37 +1,192 @@
 """
 HubSpot API基底クライアント
 """
+import asyncio
 import httpx
 import logging
-from typing import Dict, Any, Optional
-from .config import Config
+import random
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, Any, Optional
+from .config import (
+    Config, API_TIMEOUT, MAX_RETRIES, RATE_LIMIT_MAX_RETRIES, REQUESTS_PER_SECOND, SEARCH_REQUESTS_PER_SECOND
+)
+
+# HTTP/2はh2パッケージ（httpx[http2]）がある場合のみ有効化
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# orjsonがあればレスポンスのJSONパースに使用（大きなページのパースはstdlib jsonより高速）
+try:
+    import orjson
+
+    def _parse_json(response: httpx.Response) -> Any:
+        """レスポンス本文をJSONとしてパース"""
+        return orjson.loads(response.content)
+except ImportError:
+    def _parse_json(response: httpx.Response) -> Any:
+        """レスポンス本文をJSONとしてパース"""
+        return response.json()
 
 logger = logging.getLogger(__name__)
 
+# HubSpot APIへの接続数の上限
+HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=50)
+
+# リトライ時の待ち時間（秒）。RETRY_BASE_DELAY * 2^試行回数 にジッターを加え、RETRY_MAX_DELAYで打ち切る
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# 一時的なエラーとして再試行するステータスコード
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# 通信エラー・5xxでも再実行して問題ないメソッド（POSTは検索APIのみ対象）
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+class _TokenBucket:
+    """
+    クライアント側のレート制限（トークンバケット）
+
+    rate件/秒でトークンを補充し、最大capacity件までのバーストを許す。
+    上限を超えるリクエストは送信前に待機させ、429で失敗するリクエストを減らす。
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        # asyncio.Lockは作成時のイベントループに結びつくため、最初の使用時に作成する
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> None:
+        """トークンを1つ取得（足りなければ補充されるまで待つ）"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                await asyncio.sleep(wait)
+                self.tokens = 1
+                self.updated_at = time.monotonic()
+            self.tokens -= 1
+
+
+# プロセス内のすべてのリクエストで共有するレート制限（検索APIは別枠で上限が低い）
+_REQUEST_BUCKET = _TokenBucket(REQUESTS_PER_SECOND, REQUESTS_PER_SECOND)
+_SEARCH_BUCKET = _TokenBucket(SEARCH_REQUESTS_PER_SECOND, SEARCH_REQUESTS_PER_SECOND)
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Retry-Afterヘッダー（秒数）を取得（ない場合・日付形式の場合はNone）"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+# hubspot_client()のスコープ内で共有するHTTPクライアント
+_HUBSPOT_CLIENT: ContextVar[Optional[httpx.AsyncClient]] = ContextVar("hubspot_client", default=None)
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    """HubSpot API用のHTTPクライアントを作成"""
+    return httpx.AsyncClient(timeout=API_TIMEOUT, limits=HTTP_LIMITS, http2=HTTP2_AVAILABLE)
+
+
+@asynccontextmanager
+async def hubspot_client() -> AsyncIterator[httpx.AsyncClient]:
+    """
+    HubSpot API用のHTTPクライアントをスコープ内で共有する
+
+    最初に入ったときにクライアントを作成し、ネストした場合は外側のクライアントを再利用する。
+    スコープ内の_make_requestはすべて同じ接続プールを使用する。
+    """
+    client = _HUBSPOT_CLIENT.get()
+    if client is not None and not client.is_closed:
+        yield client
+        return
+
+    client = _create_http_client()
+    token = _HUBSPOT_CLIENT.set(client)
+    try:
+        yield client
+    finally:
+        _HUBSPOT_CLIENT.reset(token)
+        await client.aclose()
+
 
 class HubSpotBaseClient:
     """HubSpot API基底クライアントクラス"""
 
+    # プロセス内で共有するHTTPクライアント（接続プール・TLSセッションを再利用）
+    _http_client: Optional[httpx.AsyncClient] = None
+
     def __init__(self):
         self.api_key = Config.HUBSPOT_API_KEY
         self.base_url = Config.HUBSPOT_BASE_URL
         self.headers = Config.get_headers()
         self.hubspot_id = Config.HUBSPOT_ID
-        self.timeout = Config.API_TIMEOUT
+        self.timeout = API_TIMEOUT
+
+    @classmethod
+    def get_http_client(cls) -> httpx.AsyncClient:
+        """共有HTTPクライアントを取得（hubspot_client()のスコープ内ならそのクライアント、それ以外はプロセス共有のクライアント）"""
+        client = _HUBSPOT_CLIENT.get()
+        if client is not None and not client.is_closed:
+            return client
+        if cls._http_client is None or cls._http_client.is_closed:
+            cls._http_client = _create_http_client()
+        return cls._http_client
+
+    @classmethod
+    async def close_http_client(cls):
+        """共有HTTPクライアントを閉じる"""
+        if cls._http_client is not None:
+            await cls._http_client.aclose()
+            cls._http_client = None
+
+    def _retry_delay(self, attempt: int) -> float:
+        """attempt回目（0始まり）の再試行までの待ち時間を計算（指数バックオフ＋ジッター）"""
+        return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)) + random.uniform(0, RETRY_BASE_DELAY)
 
     async def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
-        """HubSpot APIへのリクエストを実行"""
+        """
+        HubSpot APIへのリクエストを実行
+
+        送信前にクライアント側のレート制限で待機する。429（レート制限）は常に
+        最大RATE_LIMIT_MAX_RETRIES回（Retry-Afterがあればその秒数待って）、通信エラー・
+        タイムアウト・5xxは再実行しても安全なリクエスト（GETなどと検索API）のみ、
+        指数バックオフで最大MAX_RETRIES回再試行する。
+        """
         url = f"{self.base_url}{endpoint}"
 
         # タイムアウト設定
         timeout = kwargs.pop('timeout', self.timeout)
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
+        is_search = endpoint.endswith("/search")
+        retry_safe = method.upper() in IDEMPOTENT_METHODS or is_search
+        bucket = _SEARCH_BUCKET if is_search else _REQUEST_BUCKET
+        client = self.get_http_client()
+        attempt = 0
+        while True:
             try:
+                await bucket.acquire()
                 response = await client.request(
                     method=method,
                     url=url,
                     headers=self.headers,
+                    timeout=timeout,
                     **kwargs
                 )
                 response.raise_for_status()
@@ -44,16 +199,34 @@ class HubSpotBaseClient:
                 if not response.content:
                     return {"success": True}
 
-                return response.json()
+                return _parse_json(response)
             except httpx.HTTPStatusError as e:
-                logger.error(f"HubSpot API error: {e.response.status_code} - {e.response.text}")
+                status_code = e.response.status_code
+                max_retries = RATE_LIMIT_MAX_RETRIES if status_code == 429 else MAX_RETRIES
+                if attempt < max_retries and status_code in RETRY_STATUS_CODES and (status_code == 429 or retry_safe):
+                    delay = self._retry_delay(attempt)
+                    retry_after = _retry_after_seconds(e.response)
+                    if retry_after is not None:
+                        delay = retry_after + random.uniform(0, RETRY_BASE_DELAY)
+                    logger.warning(f"HubSpot API error: {status_code}（{delay:.1f}秒後に再試行 {attempt + 1}/{max_retries}）")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    continue
+                logger.error(f"HubSpot API error: {status_code} - {e.response.text}")
                 raise
-            except httpx.TimeoutException as e:
-                logger.error(f"HubSpot API timeout: {str(e)}")
+            except httpx.TransportError as e:
+                # タイムアウトもTransportErrorに含まれる
+                if attempt < MAX_RETRIES and retry_safe:
+                    delay = self._retry_delay(attempt)
+                    logger.warning(f"HubSpot API request failed: {str(e)}（{delay:.1f}秒後に再試行 {attempt + 1}/{MAX_RETRIES}）")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    continue
+                if isinstance(e, httpx.TimeoutException):
+                    logger.error(f"HubSpot API timeout: {str(e)}")
+                else:
+                    logger.error(f"HubSpot API request failed: {str(e)}")
                 raise
             except Exception as e:
                 logger.error(f"HubSpot API request failed: {str(e)}")
                 raise
-
-
-
@@ -2,12 +2,33 @@
 HubSpot API設定
 """
 import os
-from typing import Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
 from dotenv import load_dotenv
 
 # .envファイルを読み込み
 load_dotenv()
 
+# API設定（クラス属性ではなくモジュール定数として参照できるようにする）
+API_TIMEOUT = 30.0
+MAX_RETRIES = 3
+# 429（レート制限）は一時的なため、他のエラーより多く再試行する
+RATE_LIMIT_MAX_RETRIES = 8
+# クライアント側で抑える1秒あたりのリクエスト数（HubSpotの上限: 通常API 100件/10秒、検索API 5件/秒）
+REQUESTS_PER_SECOND = 10.0
+SEARCH_REQUESTS_PER_SECOND = 4.0
+
+
+@lru_cache(maxsize=1)
+def _headers_cached(api_key: str) -> Mapping[str, str]:
+    """APIキーごとにヘッダーを一度だけ生成（変更不可のビューで返す）"""
+    return MappingProxyType({
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "Accept": "application/json"
+    })
+
 
 class Config:
     """HubSpot API設定クラス"""
@@ -19,17 +40,13 @@ class Config:
 
     # APIヘッダー設定
     @classmethod
-    def get_headers(cls) -> Dict[str, str]:
-        """動的にヘッダーを生成"""
-        return {
-            "Authorization": f"Bearer {cls.HUBSPOT_API_KEY}",
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-
-    # API設定
-    API_TIMEOUT = 30.0
-    MAX_RETRIES = 3
+    def get_headers(cls) -> Mapping[str, str]:
+        """ヘッダーを取得（APIキーは実行中に変わらないためキャッシュを返す）"""
+        return _headers_cached(cls.HUBSPOT_API_KEY)
+
+    # API設定（互換性のためクラス属性としても公開）
+    API_TIMEOUT = API_TIMEOUT
+    MAX_RETRIES = MAX_RETRIES
 
     @classmethod
     def validate_config(cls) -> bool:
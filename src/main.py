@@ -15,6 +15,7 @@ import secrets
 from contextlib import asynccontextmanager
 
 from src.database.connection import DatabaseConnection
+from src.hubspot.client import HubSpotBaseClient
 from src.auth.router import router as auth_router
 from src.api.router import router as api_router
 from src.admin.router import router as admin_router
@@ -58,6 +59,10 @@ async def lifespan(app: FastAPI):
     # データベース接続プールを作成
     await DatabaseConnection.get_pool()
     logger.info("データベース接続プールを作成しました")
+    try:
+        await DatabaseConnection.prewarm()
+    except Exception as e:
+        logger.warning(f"データベース接続プールの事前接続に失敗: {str(e)}")
     
     # 管理画面用テーブルを作成
     try:
@@ -70,21 +75,24 @@ async def lifespan(app: FastAPI):
     # データベーススキーマ情報をロード（AI学習用）
     try:
         from src.chat.service import ChatService
-        await ChatService.load_database_schema()
+        schema_changed = await ChatService.load_database_schema()
         logger.info("データベーススキーマ情報をロードしました")
         
-        # ベクトルDBにデータベース情報を保存
-        try:
-            from src.chat.vector_store import VectorStore
-            vector_store = VectorStore()
-            if vector_store.client:
-                # スキーマ情報をベクトルDBに保存
-                schema_info = ChatService.get_cached_schema()
-                if schema_info and schema_info != "スキーマ情報がまだロードされていません":
-                    vector_store.add_database_info("all_tables", "全テーブルのスキーマ情報", schema_info)
-                    logger.info("データベーススキーマ情報をベクトルDBに保存しました")
-        except Exception as e:
-            logger.warning(f"ベクトルDBへのスキーマ情報保存に失敗: {str(e)}")
+        # ベクトルDBにデータベース情報を保存（スキーマに変更がない場合は保存済みのためスキップ）
+        if not schema_changed:
+            logger.info("スキーマに変更がないため、ベクトルDBへのスキーマ情報保存をスキップします")
+        else:
+            try:
+                from src.chat.vector_store import VectorStore
+                vector_store = VectorStore()
+                if vector_store.client:
+                    # スキーマ情報をベクトルDBに保存
+                    schema_info = ChatService.get_cached_schema()
+                    if schema_info and schema_info != "スキーマ情報がまだロードされていません":
+                        vector_store.add_database_info("all_tables", "全テーブルのスキーマ情報", schema_info)
+                        logger.info("データベーススキーマ情報をベクトルDBに保存しました")
+            except Exception as e:
+                logger.warning(f"ベクトルDBへのスキーマ情報保存に失敗: {str(e)}")
     except Exception as e:
         logger.error(f"データベーススキーマ情報のロードに失敗: {str(e)}")
     
@@ -105,6 +113,12 @@ async def lifespan(app: FastAPI):
     
     # シャットダウン時
     logger.info("Mirai AI アプリケーションをシャットダウンしています...")
+    await HubSpotBaseClient.close_http_client()
+    try:
+        from src.chat.vector_store import VectorStore
+        VectorStore.close_embedding_client()
+    except Exception as e:
+        logger.warning(f"エンベディング用HTTPクライアントのクローズに失敗: {str(e)}")
     await DatabaseConnection.close_pool()
     logger.info("データベース接続プールを閉じました")
 
@@ -118,9 +132,17 @@ app = FastAPI(
 )
 
 # セッション管理（認証用）
+# SESSION_SECRET未設定時はプロセスごとに生成されるため、再起動やワーカー間でセッションが共有されない
+session_secret = os.getenv("SESSION_SECRET", "").strip()
+if not session_secret:
+    if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+        raise RuntimeError("複数ワーカーで起動する場合はSESSION_SECRETを設定してください")
+    session_secret = secrets.token_urlsafe(32)
+    logger.warning("SESSION_SECRETが設定されていないため、一時的なシークレットを生成しました（再起動でセッションは無効になります）")
+
 app.add_middleware(
     SessionMiddleware,
-    secret_key=os.getenv("SESSION_SECRET", secrets.token_urlsafe(32)),
+    secret_key=session_secret,
     max_age=86400,  # 24時間
     same_site="lax"
 )
@@ -162,10 +184,15 @@ async def health_check():
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8000"))
+    reload = os.getenv("ENVIRONMENT") == "development"
+    # uvicorn[standard]に含まれるuvloop/httptoolsを使用
     uvicorn.run(
         "src.main:app",
         host="0.0.0.0",
         port=port,
-        reload=os.getenv("ENVIRONMENT") == "development"
+        reload=reload,
+        loop="uvloop",
+        http="httptools",
+        workers=None if reload else int(os.getenv("WEB_CONCURRENCY", "1"))
     )
 
@@ -3,12 +3,42 @@
 """
 import logging
 from fastapi import Request, HTTPException, Depends
-from typing import Optional, Dict, Any
-from functools import wraps
+from typing import Annotated, Optional, Dict, Any
+from cachetools import TTLCache
 from src.database.connection import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
+# 認証はすべてのリクエストで実行されるため、接続が取得できない場合は早めに失敗させる
+AUTH_ACQUIRE_TIMEOUT = 2.0
+
+# ユーザー情報のキャッシュの有効期間（秒）。削除されたユーザーが使える期間を短く抑える
+USER_CACHE_TTL = 5
+
+# ユーザー情報のキャッシュ（user_id → ユーザー情報）
+# キャッシュはワーカープロセスごとに持つため、WEB_CONCURRENCY > 1の場合は
+# invalidate_user_cacheを呼んだワーカー以外でUSER_CACHE_TTL秒まで古い情報が残る。
+# 権限の変更をすぐに反映させるため、管理者権限はrequire_adminでデータベースから毎回確認する
+_USER_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=USER_CACHE_TTL)
+
+
+def invalidate_user_cache(user_id: Optional[int]) -> None:
+    """ユーザー情報のキャッシュを破棄（ログアウト・ユーザー情報更新時。このワーカーのキャッシュのみ）"""
+    if user_id:
+        _USER_CACHE.pop(user_id, None)
+
+
+async def _fetch_role(user_id: int) -> Optional[str]:
+    """ユーザーのロールをデータベースから取得（キャッシュを使わない。取得できない場合はNone）"""
+    try:
+        async with DatabaseConnection.get_cursor(timeout=AUTH_ACQUIRE_TIMEOUT) as (cursor, conn):
+            await cursor.execute("SELECT role FROM users WHERE id = %s", (user_id,))
+            row = await cursor.fetchone()
+    except Exception as e:
+        logger.error(f"ロール取得エラー: {str(e)}", exc_info=True)
+        return None
+    return row['role'] if row else None
+
 
 async def get_current_user(request: Request) -> Optional[Dict[str, Any]]:
     """現在のユーザーを取得"""
@@ -17,39 +47,49 @@ async def get_current_user(request: Request) -> Optional[Dict[str, Any]]:
         logger.debug("セッションにuser_idがありません")
         return None
     
-    try:
-        async with DatabaseConnection.get_cursor() as (cursor, conn):
-            await cursor.execute(
-                """
-                SELECT u.*, o.email as owner_email, o.firstname, o.lastname
-                FROM users u
-                LEFT JOIN owners o ON u.owner_id = o.id
-                WHERE u.id = %s
-                """,
-                (user_id,)
-            )
-            user = await cursor.fetchone()
-            if not user:
-                logger.warning(f"ユーザーが見つかりません: user_id={user_id}")
-            return user
-    except Exception as e:
-        logger.error(f"ユーザー取得エラー: {str(e)}", exc_info=True)
-        return None
+    # 同一リクエスト内で既に取得済みの場合はそれを使用
+    user = getattr(request.state, "current_user", None)
+    if user is not None and user.get("id") == user_id:
+        return dict(user)
+    
+    user = _USER_CACHE.get(user_id)
+    if user is None:
+        try:
+            async with DatabaseConnection.get_cursor(timeout=AUTH_ACQUIRE_TIMEOUT) as (cursor, conn):
+                await cursor.execute(
+                    """
+                    SELECT u.*, o.email as owner_email, o.firstname, o.lastname
+                    FROM users u
+                    LEFT JOIN owners o ON u.owner_id = o.id
+                    WHERE u.id = %s
+                    """,
+                    (user_id,)
+                )
+                user = await cursor.fetchone()
+                if not user:
+                    logger.warning(f"ユーザーが見つかりません: user_id={user_id}")
+                    return None
+                _USER_CACHE[user_id] = user
+        except Exception as e:
+            logger.error(f"ユーザー取得エラー: {str(e)}", exc_info=True)
+            return None
+    
+    request.state.current_user = user
+    # 呼び出し側での変更がキャッシュに影響しないようコピーを返す
+    return dict(user)
 
 
-def require_login(func):
-    """ログイン必須デコレータ"""
-    @wraps(func)
-    async def wrapper(request: Request, *args, **kwargs):
-        user = await get_current_user(request)
-        if not user:
-            logger.warning(f"認証が必要です: {request.url}")
-            from fastapi.responses import RedirectResponse
-            return RedirectResponse(url="/auth/login")
-        # userをkwargsに追加（既にuserがkwargsにある場合は上書きする）
-        kwargs['user'] = user
-        return await func(request, *args, **kwargs)
-    return wrapper
+async def get_current_user_or_redirect(request: Request) -> Dict[str, Any]:
+    """ログイン必須の依存関係（未ログインの場合はログインページへリダイレクト）"""
+    user = await get_current_user(request)
+    if not user:
+        logger.warning(f"認証が必要です: {request.url}")
+        raise HTTPException(status_code=307, headers={"Location": "/auth/login"})
+    return user
+
+
+# ログイン必須のルートで使用するユーザー情報の型（FastAPIがリクエストごとに1回だけ解決する）
+CurrentUser = Annotated[Dict[str, Any], Depends(get_current_user_or_redirect)]
 
 
 async def require_admin(user: Dict[str, Any] = Depends(get_current_user)):
@@ -58,5 +98,10 @@ async def require_admin(user: Dict[str, Any] = Depends(get_current_user)):
         raise HTTPException(status_code=401, detail="認証が必要です")
     if user.get('role') != 'admin':
         raise HTTPException(status_code=403, detail="管理者権限が必要です")
+    # キャッシュ上のロールが古い可能性があるため、管理者ルートではデータベースで再確認する
+    role = await _fetch_role(user['id'])
+    if role != 'admin':
+        invalidate_user_cache(user['id'])
+        raise HTTPException(status_code=403, detail="管理者権限が必要です")
     return user
 
@@ -1,409 +1,444 @@
 """
 HubSpot Activities同期処理
 """
+import asyncio
 import logging
-import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from datetime import datetime
 
-from src.sync.base_sync import BaseSync
-from src.database.connection import DatabaseConnection
+from src.sync.base_sync import BaseSync, BATCH_SIZE
+from src.sync.converters import parse_datetime, to_json
 
 logger = logging.getLogger(__name__)
 
+# 取得対象のアクティビティタイプ（INCOMING_EMAILとFORWARDED_EMAILは除外）
+TARGET_ENGAGEMENT_TYPES = frozenset({"CALL", "EMAIL", "NOTE"})
+
+# activity_type ENUMの値（Engagementタイプをそのまま使用し、それ以外はOTHER）
+ACTIVITY_TYPES = frozenset({
+    "NOTE", "CALL", "EMAIL", "MEETING", "TASK", "INCOMING_EMAIL", "FORWARDED_EMAIL",
+    "LINKEDIN_MESSAGE", "POSTAL_MAIL", "PUBLISHING_TASK", "SMS", "CONVERSATION_SESSION"
+})
+
+# Engagements APIの1ページあたりの取得件数
+PAGE_LIMIT = 100
+
+# 関連オブジェクトのID対応表を読み込むSQL（hubspot_owner_idカラムを持つテーブルはあわせて取得）
+OBJECT_INDEX_SQL = {
+    "companies": "SELECT id, hubspot_id, hubspot_owner_id FROM companies",
+    "contacts": "SELECT id, hubspot_id, hubspot_owner_id FROM contacts",
+    "deals_purchase": "SELECT id, hubspot_id, hubspot_owner_id FROM deals_purchase",
+    "deals_sales": "SELECT id, hubspot_id, hubspot_owner_id FROM deals_sales",
+    "properties": "SELECT id, hubspot_id FROM properties",
+    "tickets": "SELECT id, hubspot_id FROM tickets"
+}
+
+# associationsのキーと関連オブジェクトのテーブルの対応
+ASSOCIATION_OBJECT_TYPES = {
+    "contactIds": "contacts",
+    "companyIds": "companies",
+    "dealIds": "deals_purchase",  # デフォルトはpurchase、実際のパイプラインで判断が必要
+    "ticketIds": "tickets"
+}
+
+# EMAILのownerIdを関連オブジェクトから取得する際の優先順位
+EMAIL_OWNER_ASSOCIATION_TYPES = ("contactIds", "companyIds", "dealIds")
+
+# executemanyで複数行INSERTに書き換えられるよう、VALUESは%sのみで構成する
+ACTIVITIES_INSERT_SQL = """
+    INSERT INTO activities
+    (hubspot_engagement_id, activity_type, owner_id, activity_timestamp, active, last_synced_at)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        activity_type = VALUES(activity_type),
+        owner_id = VALUES(owner_id),
+        activity_timestamp = VALUES(activity_timestamp),
+        active = VALUES(active),
+        last_synced_at = VALUES(last_synced_at),
+        updated_at = NOW()
+"""
+
+ACTIVITY_DETAILS_INSERT_SQL = """
+    INSERT INTO activity_details
+    (activity_id, subject, body, metadata)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        subject = VALUES(subject),
+        body = VALUES(body),
+        metadata = VALUES(metadata),
+        updated_at = NOW()
+"""
+
+ACTIVITY_ASSOCIATIONS_INSERT_SQL = """
+    INSERT INTO activity_associations
+    (activity_id, object_type, object_id, hubspot_object_id, association_type)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        object_id = VALUES(object_id),
+        hubspot_object_id = VALUES(hubspot_object_id)
+"""
+
+ACTIVITY_EMAILS_INSERT_SQL = """
+    INSERT INTO activity_emails
+    (activity_id, from_email, to_emails, cc_emails, bcc_emails, subject, html_body, text_body, email_status)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        from_email = VALUES(from_email),
+        to_emails = VALUES(to_emails),
+        cc_emails = VALUES(cc_emails),
+        bcc_emails = VALUES(bcc_emails),
+        subject = VALUES(subject),
+        html_body = VALUES(html_body),
+        text_body = VALUES(text_body),
+        email_status = VALUES(email_status),
+        updated_at = NOW()
+"""
+
+ACTIVITY_CALLS_INSERT_SQL = """
+    INSERT INTO activity_calls
+    (activity_id, call_duration, call_direction, call_status, recording_url, transcript)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        call_duration = VALUES(call_duration),
+        call_direction = VALUES(call_direction),
+        call_status = VALUES(call_status),
+        recording_url = VALUES(recording_url),
+        transcript = VALUES(transcript),
+        updated_at = NOW()
+"""
+
+ACTIVITY_MEETINGS_INSERT_SQL = """
+    INSERT INTO activity_meetings
+    (activity_id, meeting_title, meeting_start_time, meeting_end_time, meeting_location, meeting_url, attendees)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        meeting_title = VALUES(meeting_title),
+        meeting_start_time = VALUES(meeting_start_time),
+        meeting_end_time = VALUES(meeting_end_time),
+        meeting_location = VALUES(meeting_location),
+        meeting_url = VALUES(meeting_url),
+        attendees = VALUES(attendees),
+        updated_at = NOW()
+"""
+
 
 class ActivitiesSync(BaseSync):
     """Activities同期クラス"""
 
     def __init__(self):
         super().__init__("activities")
-
-    async def fetch_all(self) -> List[Dict[str, Any]]:
-        """HubSpotからactivitiesを取得（CALL, EMAIL, NOTEのみ）"""
-        activities = []
-        after = None
-        limit = 100
-        # 取得対象のアクティビティタイプ（INCOMING_EMAILとFORWARDED_EMAILは除外）
-        target_types = {"CALL", "EMAIL", "NOTE"}
-
+        # hubspot_id -> owners.id
+        self._owner_by_hubspot: Dict[str, int] = {}
+        # object_type -> hubspot_id -> (id, hubspot_owner_id)
+        self._obj_index: Dict[str, Dict[str, Tuple[int, Optional[int]]]] = {}
+
+    async def _produce_pages(self, queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]") -> None:
+        """Engagements APIのページを順に取得してキューに投入"""
+        offset = None
+        while True:
+            params = {"limit": PAGE_LIMIT}
+            if offset:
+                params["offset"] = offset
+
+            # Engagements APIを使用
+            response = await self.client._make_request("GET", "/engagements/v1/engagements/paged", params=params)
+            results = response.get("results", [])
+            await queue.put(results)
+
+            # ページネーションの確認
+            has_more = response.get("hasMore", False)
+            new_offset = response.get("offset")
+
+            if not has_more or len(results) == 0:
+                break
+
+            # offsetが更新されていない場合は終了（無限ループ防止）
+            if new_offset is None:
+                # offsetが取得できない場合は終了
+                logger.warning("offsetが取得できません。ループを終了します")
+                break
+            if new_offset == offset:
+                logger.warning(f"ページネーションが進んでいないため、ループを終了します (offset: {new_offset})")
+                break
+            offset = new_offset
+
+    async def fetch_pages(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        """HubSpotからactivitiesをページ単位で取得（CALL, EMAIL, NOTEのみ）
+
+        次のページの取得を、前のページのフィルタリング・保存と並行して行う。
+        """
+        # 同期ごとにowner/オブジェクトの対応表を読み直す
+        self._owner_by_hubspot = {}
+        self._obj_index = {}
+
+        fetched_count = 0
         try:
-            offset = None
-            while True:
-                params = {"limit": limit}
-                if offset:
-                    params["offset"] = offset
-
-                # Engagements APIを使用
-                response = await self.client._make_request("GET", "/engagements/v1/engagements/paged", params=params)
-                results = response.get("results", [])
-                
+            async for results in self._iter_prefetched(self._produce_pages):
                 # 対象タイプのみをフィルタリング
-                filtered_results = []
-                for result in results:
-                    engagement_type = result.get("engagement", {}).get("type", "").upper()
-                    if engagement_type in target_types:
-                        filtered_results.append(result)
-                
-                activities.extend(filtered_results)
-
-                logger.info(f"取得中: {len(activities)}件... (フィルタ後: {len(filtered_results)}件/{len(results)}件)")
-
-                # ページネーションの確認
-                has_more = response.get("hasMore", False)
-                new_offset = response.get("offset")
-                
-                if not has_more or len(results) == 0:
-                    break
-                
-                # offsetが更新されていない場合は終了（無限ループ防止）
-                if new_offset is not None:
-                    if offset and str(new_offset) == str(offset):
-                        logger.warning(f"ページネーションが進んでいないため、ループを終了します (offset: {new_offset})")
-                        break
-                    offset = new_offset
-                else:
-                    # offsetが取得できない場合は終了
-                    logger.warning("offsetが取得できません。ループを終了します")
-                    break
-
-            logger.info(f"HubSpotから{len(activities)}件のactivitiesを取得しました（CALL, EMAIL, NOTEのみ）")
+                filtered_results = [
+                    result for result in results
+                    if result.get("engagement", {}).get("type", "").upper() in TARGET_ENGAGEMENT_TYPES
+                ]
+                fetched_count += len(filtered_results)
+
+                logger.info(f"取得中: {fetched_count}件... (フィルタ後: {len(filtered_results)}件/{len(results)}件)")
+
+                if filtered_results:
+                    yield filtered_results
+
+            logger.info(f"HubSpotから{fetched_count}件のactivitiesを取得しました（CALL, EMAIL, NOTEのみ）")
         except Exception as e:
             logger.error(f"HubSpot Activities取得エラー: {str(e)}")
             raise
 
-        return activities
+    async def fetch_all(self) -> List[Dict[str, Any]]:
+        """HubSpotからactivitiesを取得（CALL, EMAIL, NOTEのみ）"""
+        return [activity async for page in self.fetch_pages() for activity in page]
 
     def _parse_activity_type(self, engagement_type: str) -> str:
         """Engagementタイプをactivity_type ENUMに変換"""
-        type_mapping = {
-            "NOTE": "NOTE",
-            "CALL": "CALL",
-            "EMAIL": "EMAIL",
-            "MEETING": "MEETING",
-            "TASK": "TASK",
-            "INCOMING_EMAIL": "INCOMING_EMAIL",
-            "FORWARDED_EMAIL": "FORWARDED_EMAIL",
-            "LINKEDIN_MESSAGE": "LINKEDIN_MESSAGE",
-            "POSTAL_MAIL": "POSTAL_MAIL",
-            "PUBLISHING_TASK": "PUBLISHING_TASK",
-            "SMS": "SMS",
-            "CONVERSATION_SESSION": "CONVERSATION_SESSION"
-        }
-        return type_mapping.get(engagement_type.upper(), "OTHER")
+        return t if (t := engagement_type.upper()) in ACTIVITY_TYPES else "OTHER"
 
     def _parse_datetime(self, value: Any) -> Optional[datetime]:
         """日時文字列をdatetimeに変換"""
-        if not value:
-            return None
-        if isinstance(value, datetime):
-            return value
-        if isinstance(value, (int, float)):
-            try:
-                return datetime.fromtimestamp(value / 1000)
-            except:
-                return None
-        if isinstance(value, str):
-            try:
-                for fmt in ["%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
-                    try:
-                        return datetime.strptime(value, fmt)
-                    except:
-                        continue
-            except:
-                pass
-        return None
+        return parse_datetime(value)
+
+    async def _load_lookup_maps(self, cursor) -> None:
+        """ownerと関連オブジェクトのID対応表を一括でメモリに読み込む"""
+        self._owner_by_hubspot = await self._get_owner_map(cursor)
 
-    async def _get_owner_id(self, hubspot_owner_id: Optional[str]) -> Optional[int]:
+        self._obj_index = {"owners": {hubspot_id: (owner_id, None) for hubspot_id, owner_id in self._owner_by_hubspot.items()}}
+        for table_name, sql in OBJECT_INDEX_SQL.items():
+            index = {}
+            try:
+                await cursor.execute(sql)
+                for row in await cursor.fetchall():
+                    index[str(row["hubspot_id"])] = (row["id"], row.get("hubspot_owner_id"))
+            except Exception as e:
+                # ticketsテーブルなど存在しない場合は空のまま扱う
+                logger.warning(f"Object ID一覧の取得エラー (object_type: {table_name}): {str(e)}")
+            self._obj_index[table_name] = index
+
+    def _get_owner_id(self, hubspot_owner_id: Optional[str]) -> Optional[int]:
         """HubSpot owner IDからデータベースのowner IDを取得"""
         if not hubspot_owner_id:
             return None
+        return self._owner_by_hubspot.get(str(hubspot_owner_id))
 
-        try:
-            async with DatabaseConnection.get_cursor() as (cursor, conn):
-                await cursor.execute(
-                    "SELECT id FROM owners WHERE hubspot_id = %s",
-                    (str(hubspot_owner_id),)
-                )
-                result = await cursor.fetchone()
-                if result:
-                    return result.get("id")
-                return None
-        except Exception as e:
-            logger.warning(f"Owner ID取得エラー (hubspot_id: {hubspot_owner_id}): {str(e)}")
-            return None
-
-    async def _get_object_id(self, object_type: str, hubspot_object_id: str) -> Optional[int]:
-        """HubSpotオブジェクトIDからデータベースのオブジェクトIDを取得"""
+    def _get_object(self, object_type: str, hubspot_object_id: str) -> Optional[Tuple[int, Optional[int]]]:
+        """HubSpotオブジェクトIDから(データベースのID, hubspot_owner_id)を取得"""
         if not hubspot_object_id:
             return None
+        return self._obj_index.get(object_type, {}).get(str(hubspot_object_id))
 
-        try:
-            async with DatabaseConnection.get_cursor() as (cursor, conn):
-                table_map = {
-                    "companies": "companies",
-                    "contacts": "contacts",
-                    "deals_purchase": "deals_purchase",
-                    "deals_sales": "deals_sales",
-                    "properties": "properties",
-                    "owners": "owners"
-                }
-                table_name = table_map.get(object_type)
-                if not table_name:
-                    return None
-
-                await cursor.execute(
-                    f"SELECT id FROM {table_name} WHERE hubspot_id = %s",
-                    (str(hubspot_object_id),)
+    def _get_object_id(self, object_type: str, hubspot_object_id: str) -> Optional[int]:
+        """HubSpotオブジェクトIDからデータベースのオブジェクトIDを取得"""
+        obj = self._get_object(object_type, hubspot_object_id)
+        return obj[0] if obj else None
+
+    def _prepare_activity_rows(
+        self,
+        records: List[Dict[str, Any]],
+        now: datetime
+    ) -> Tuple[List[tuple], List[Tuple[str, str, Dict[str, Any]]]]:
+        """
+        activitiesテーブルの行を組み立て（DBアクセスなし、スレッドで実行）
+
+        Returns:
+            (activitiesの行, 後続の組み立て用の(engagement_id, activity_type, engagement)のリスト)
+        """
+        total = len(records)
+        activities_rows = []
+        prepared = []
+        for idx, engagement in enumerate(records, 1):
+            if idx % 100 == 0 or idx == total:
+                percentage = (idx / total * 100) if total > 0 else 0
+                logger.info(f"保存準備: {idx}/{total}件 ({percentage:.1f}%)")
+            try:
+                engagement_info = engagement.get("engagement", {})
+                engagement_id = str(engagement_info.get("id", ""))
+                activity_type = self._parse_activity_type(engagement_info.get("type", ""))
+
+                # Owner IDの解決
+                owner_id_str = engagement_info.get("ownerId")
+                owner_id = self._get_owner_id(owner_id_str)
+
+                # EMAILタイプでownerIdが取得できない場合、関連付けられたオブジェクトから取得
+                if not owner_id and activity_type == "EMAIL":
+                    owner_id = self._resolve_email_owner_id(engagement_id, engagement.get("associations", {}))
+
+                # タイムスタンプ
+                timestamp_ms = engagement_info.get("timestamp")
+                activity_timestamp = self._parse_datetime(timestamp_ms) if timestamp_ms else now
+
+                # Active状態
+                active = not engagement_info.get("archived", False)
+
+                activities_rows.append((engagement_id, activity_type, owner_id, activity_timestamp, active, now))
+                prepared.append((engagement_id, activity_type, engagement))
+            except Exception as e:
+                logger.error(f"Activity保存エラー (engagement_id: {engagement.get('engagement', {}).get('id')}): {str(e)}")
+                continue
+        return activities_rows, prepared
+
+    def _prepare_detail_rows(
+        self,
+        prepared: List[Tuple[str, str, Dict[str, Any]]],
+        activity_ids: Dict[str, int]
+    ) -> Tuple[Dict[str, List[tuple]], int]:
+        """
+        詳細・関連付け・タイプ別テーブルの行を組み立て（DBアクセスなし、スレッドで実行）
+
+        Returns:
+            (テーブルごとの行, 保存対象のアクティビティ数)
+        """
+        details_rows = []
+        assoc_rows = []
+        email_rows = []
+        call_rows = []
+        meeting_rows = []
+        saved_count = 0
+        obj_index = self._obj_index
+        for engagement_id, activity_type, engagement in prepared:
+            activity_id = activity_ids.get(engagement_id)
+            if not activity_id:
+                continue
+            try:
+                engagement_info = engagement.get("engagement", {})
+                metadata = engagement.get("metadata", {})
+                associations = engagement.get("associations", {})
+
+                # activity_details
+                subject = metadata.get("subject") or engagement_info.get("subject")
+                body = metadata.get("body") or engagement_info.get("body")
+                metadata_json = to_json(metadata) if metadata else None
+                details_rows.append((activity_id, subject, body, metadata_json))
+
+                # アクティビティ関連付け
+                assoc_rows.extend(
+                    (activity_id, object_type, obj_index[object_type].get(hubspot_object_id, (None,))[0], hubspot_object_id, assoc_type)
+                    for assoc_type, object_ids in associations.items()
+                    if isinstance(object_ids, list) and (object_type := ASSOCIATION_OBJECT_TYPES.get(assoc_type))
+                    for hubspot_object_id in map(str, object_ids)
                 )
-                result = await cursor.fetchone()
-                if result:
-                    return result.get("id")
-                return None
-        except Exception as e:
-            logger.warning(f"Object ID取得エラー (object_type: {object_type}, hubspot_id: {hubspot_object_id}): {str(e)}")
-            return None
+
+                # タイプ別の詳細テーブル（CALL, EMAIL, NOTEのみ）
+                if activity_type in ["EMAIL", "INCOMING_EMAIL", "FORWARDED_EMAIL"]:
+                    to_emails = metadata.get("toEmail", [])
+                    cc_emails = metadata.get("ccEmail", [])
+                    bcc_emails = metadata.get("bccEmail", [])
+                    email_rows.append((
+                        activity_id, metadata.get("fromEmail"),
+                        to_json(to_emails) if to_emails else None,
+                        to_json(cc_emails) if cc_emails else None,
+                        to_json(bcc_emails) if bcc_emails else None,
+                        subject, metadata.get("html"), metadata.get("text"), metadata.get("status")
+                    ))
+
+                elif activity_type == "CALL":
+                    call_duration = metadata.get("durationMilliseconds")
+                    if call_duration:
+                        call_duration = call_duration // 1000  # ミリ秒を秒に変換
+                    call_rows.append((
+                        activity_id, call_duration, metadata.get("direction"), metadata.get("status"),
+                        metadata.get("recordingUrl"), metadata.get("transcript")
+                    ))
+
+                elif activity_type == "MEETING":
+                    attendees = metadata.get("attendees", [])
+                    meeting_rows.append((
+                        activity_id, subject,
+                        self._parse_datetime(metadata.get("startTime")),
+                        self._parse_datetime(metadata.get("endTime")),
+                        metadata.get("location"), metadata.get("meetingUrl"),
+                        to_json(attendees) if attendees else None
+                    ))
+
+                # NOTEタイプの場合はactivity_detailsのみに保存
+                # TASK等の他のタイプはスキップ
+
+                saved_count += 1
+
+            except Exception as e:
+                logger.error(f"Activity保存エラー (engagement_id: {engagement_id}): {str(e)}")
+                continue
+
+        rows = {
+            ACTIVITY_DETAILS_INSERT_SQL: details_rows,
+            ACTIVITY_ASSOCIATIONS_INSERT_SQL: assoc_rows,
+            ACTIVITY_EMAILS_INSERT_SQL: email_rows,
+            ACTIVITY_CALLS_INSERT_SQL: call_rows,
+            ACTIVITY_MEETINGS_INSERT_SQL: meeting_rows
+        }
+        return rows, saved_count
 
     async def save_to_db(self, records: List[Dict[str, Any]]) -> int:
-        """データベースに保存"""
-        saved_count = 0
+        """
+        データベースに保存（executemanyによる一括保存）
+
+        行の組み立て（JSON変換・日時変換など）はスレッドで実行し、イベントループを塞がないようにする。
+        """
         total = len(records)
         logger.info(f"データベースへの保存を開始します（全{total}件）")
+        now = datetime.now()
+
+        async with self._cursor() as (cursor, conn):
+            # 対応表は同期中に1回だけ読み込み、以降のページでは再利用する
+            if not self._obj_index:
+                await self._load_lookup_maps(cursor)
 
-        async with DatabaseConnection.get_cursor() as (cursor, conn):
-            for idx, engagement in enumerate(records, 1):
-                if idx % 100 == 0 or idx == total:
-                    percentage = (idx / total * 100) if total > 0 else 0
-                    logger.info(f"保存進捗: {idx}/{total}件 ({percentage:.1f}%)")
-                try:
-                    engagement_id = str(engagement.get("engagement", {}).get("id", ""))
-                    engagement_type = engagement.get("engagement", {}).get("type", "")
-                    activity_type = self._parse_activity_type(engagement_type)
-                    
-                    # Owner IDの解決
-                    owner_id_str = engagement.get("engagement", {}).get("ownerId")
-                    owner_id = await self._get_owner_id(owner_id_str) if owner_id_str else None
-                    
-                    # EMAILタイプでownerIdが取得できない場合、関連付けられたオブジェクトから取得
-                    if not owner_id and activity_type == "EMAIL":
-                        associations = engagement.get("associations", {})
-                        logger.debug(f"EMAILアクティビティ {engagement_id}: associations={list(associations.keys())}")
-                        # 優先順位: contactIds > companyIds > dealIds
-                        for assoc_type in ["contactIds", "companyIds", "dealIds"]:
-                            if assoc_type in associations and associations[assoc_type]:
-                                object_type_map = {
-                                    "contactIds": "contacts",
-                                    "companyIds": "companies",
-                                    "dealIds": "deals_purchase"
-                                }
-                                object_type = object_type_map.get(assoc_type)
-                                if object_type:
-                                    # 最初の関連オブジェクトのownerIdを取得
-                                    hubspot_object_id = str(associations[assoc_type][0])
-                                    object_id = await self._get_object_id(object_type, hubspot_object_id)
-                                    if object_id:
-                                        # オブジェクトのhubspot_owner_idを取得
-                                        try:
-                                            await cursor.execute(
-                                                f"SELECT hubspot_owner_id FROM {object_type} WHERE id = %s",
-                                                (object_id,)
-                                            )
-                                            object_result = await cursor.fetchone()
-                                            if object_result and object_result.get("hubspot_owner_id"):
-                                                object_owner_id_str = str(object_result.get("hubspot_owner_id"))
-                                                owner_id = await self._get_owner_id(object_owner_id_str)
-                                                if owner_id:
-                                                    logger.info(f"EMAILアクティビティ {engagement_id} のownerIdを関連オブジェクト ({object_type}, id={object_id}, hubspot_owner_id={object_owner_id_str}) から取得: {owner_id}")
-                                                    break
-                                                else:
-                                                    logger.warning(f"EMAILアクティビティ {engagement_id}: hubspot_owner_id={object_owner_id_str} に対応するowner_idが見つかりませんでした")
-                                            else:
-                                                logger.debug(f"EMAILアクティビティ {engagement_id}: {object_type} id={object_id} のhubspot_owner_idがNULLです")
-                                        except Exception as e:
-                                            logger.warning(f"関連オブジェクトからownerIdを取得する際にエラー: {str(e)}")
-                                            continue
-                                    else:
-                                        logger.debug(f"EMAILアクティビティ {engagement_id}: {object_type} hubspot_id={hubspot_object_id} に対応するobject_idが見つかりませんでした")
-                    
-                    # タイムスタンプ
-                    timestamp_ms = engagement.get("engagement", {}).get("timestamp")
-                    activity_timestamp = self._parse_datetime(timestamp_ms) if timestamp_ms else datetime.now()
-                    
-                    # Active状態
-                    active = not engagement.get("engagement", {}).get("archived", False)
-
-                    # アクティビティマスタを保存
-                    await cursor.execute(
-                        """
-                        INSERT INTO activities 
-                        (hubspot_engagement_id, activity_type, owner_id, activity_timestamp, active, last_synced_at)
-                        VALUES (%s, %s, %s, %s, %s, NOW())
-                        ON DUPLICATE KEY UPDATE
-                            activity_type = VALUES(activity_type),
-                            owner_id = VALUES(owner_id),
-                            activity_timestamp = VALUES(activity_timestamp),
-                            active = VALUES(active),
-                            last_synced_at = NOW(),
-                            updated_at = NOW()
-                        """,
-                        (engagement_id, activity_type, owner_id, activity_timestamp, active)
-                    )
-                    
-                    # 保存されたactivity_idを取得
-                    await cursor.execute(
-                        "SELECT id FROM activities WHERE hubspot_engagement_id = %s",
-                        (engagement_id,)
-                    )
-                    activity_result = await cursor.fetchone()
-                    if not activity_result:
-                        continue
-                    activity_id = activity_result.get("id")
-
-                    # アクティビティ詳細を保存
-                    metadata = engagement.get("metadata", {})
-                    associations = engagement.get("associations", {})
-                    
-                    # activity_detailsを保存
-                    subject = metadata.get("subject") or engagement.get("engagement", {}).get("subject")
-                    body = metadata.get("body") or engagement.get("engagement", {}).get("body")
-                    metadata_json = json.dumps(metadata) if metadata else None
-
-                    await cursor.execute(
-                        """
-                        INSERT INTO activity_details 
-                        (activity_id, subject, body, metadata)
-                        VALUES (%s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                            subject = VALUES(subject),
-                            body = VALUES(body),
-                            metadata = VALUES(metadata),
-                            updated_at = NOW()
-                        """,
-                        (activity_id, subject, body, metadata_json)
-                    )
-
-                    # アクティビティ関連付けを保存
-                    for assoc_type, object_ids in associations.items():
-                        if not isinstance(object_ids, list):
-                            continue
-                        
-                        # オブジェクトタイプのマッピング
-                        object_type_map = {
-                            "contactIds": "contacts",
-                            "companyIds": "companies",
-                            "dealIds": "deals_purchase",  # デフォルトはpurchase、実際のパイプラインで判断が必要
-                            "ticketIds": "tickets"
-                        }
-                        object_type = object_type_map.get(assoc_type)
-                        if not object_type:
-                            continue
-
-                        for hubspot_object_id in object_ids:
-                            object_id = await self._get_object_id(object_type, str(hubspot_object_id))
-                            await cursor.execute(
-                                """
-                                INSERT INTO activity_associations 
-                                (activity_id, object_type, object_id, hubspot_object_id, association_type)
-                                VALUES (%s, %s, %s, %s, %s)
-                                ON DUPLICATE KEY UPDATE
-                                    object_id = VALUES(object_id),
-                                    hubspot_object_id = VALUES(hubspot_object_id)
-                                """,
-                                (activity_id, object_type, object_id, str(hubspot_object_id), assoc_type)
-                            )
-
-                    # タイプ別の詳細テーブルに保存（CALL, EMAIL, NOTEのみ）
-                    if activity_type in ["EMAIL", "INCOMING_EMAIL", "FORWARDED_EMAIL"]:
-                        from_email = metadata.get("fromEmail")
-                        to_emails = metadata.get("toEmail", [])
-                        cc_emails = metadata.get("ccEmail", [])
-                        bcc_emails = metadata.get("bccEmail", [])
-                        email_subject = subject
-                        html_body = metadata.get("html")
-                        text_body = metadata.get("text")
-                        email_status = metadata.get("status")
-
-                        await cursor.execute(
-                            """
-                            INSERT INTO activity_emails 
-                            (activity_id, from_email, to_emails, cc_emails, bcc_emails, subject, html_body, text_body, email_status)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON DUPLICATE KEY UPDATE
-                                from_email = VALUES(from_email),
-                                to_emails = VALUES(to_emails),
-                                cc_emails = VALUES(cc_emails),
-                                bcc_emails = VALUES(bcc_emails),
-                                subject = VALUES(subject),
-                                html_body = VALUES(html_body),
-                                text_body = VALUES(text_body),
-                                email_status = VALUES(email_status),
-                                updated_at = NOW()
-                            """,
-                            (activity_id, from_email, json.dumps(to_emails) if to_emails else None,
-                             json.dumps(cc_emails) if cc_emails else None, json.dumps(bcc_emails) if bcc_emails else None,
-                             email_subject, html_body, text_body, email_status)
-                        )
-
-                    elif activity_type == "CALL":
-                        call_duration = metadata.get("durationMilliseconds")
-                        if call_duration:
-                            call_duration = call_duration // 1000  # ミリ秒を秒に変換
-                        call_direction = metadata.get("direction")
-                        call_status = metadata.get("status")
-                        recording_url = metadata.get("recordingUrl")
-                        transcript = metadata.get("transcript")
-
-                        await cursor.execute(
-                            """
-                            INSERT INTO activity_calls 
-                            (activity_id, call_duration, call_direction, call_status, recording_url, transcript)
-                            VALUES (%s, %s, %s, %s, %s, %s)
-                            ON DUPLICATE KEY UPDATE
-                                call_duration = VALUES(call_duration),
-                                call_direction = VALUES(call_direction),
-                                call_status = VALUES(call_status),
-                                recording_url = VALUES(recording_url),
-                                transcript = VALUES(transcript),
-                                updated_at = NOW()
-                            """,
-                            (activity_id, call_duration, call_direction, call_status, recording_url, transcript)
-                        )
-
-                    elif activity_type == "MEETING":
-                        meeting_title = subject
-                        meeting_start_time = self._parse_datetime(metadata.get("startTime"))
-                        meeting_end_time = self._parse_datetime(metadata.get("endTime"))
-                        meeting_location = metadata.get("location")
-                        meeting_url = metadata.get("meetingUrl")
-                        attendees = metadata.get("attendees", [])
-
-                        await cursor.execute(
-                            """
-                            INSERT INTO activity_meetings 
-                            (activity_id, meeting_title, meeting_start_time, meeting_end_time, meeting_location, meeting_url, attendees)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            ON DUPLICATE KEY UPDATE
-                                meeting_title = VALUES(meeting_title),
-                                meeting_start_time = VALUES(meeting_start_time),
-                                meeting_end_time = VALUES(meeting_end_time),
-                                meeting_location = VALUES(meeting_location),
-                                meeting_url = VALUES(meeting_url),
-                                attendees = VALUES(attendees),
-                                updated_at = NOW()
-                            """,
-                            (activity_id, meeting_title, meeting_start_time, meeting_end_time, meeting_location, meeting_url,
-                             json.dumps(attendees) if attendees else None)
-                        )
-
-                    # NOTEタイプの場合はactivity_detailsのみに保存（既に保存済み）
-                    # TASK, MEETING等の他のタイプはスキップ
-
-                    saved_count += 1
-
-                except Exception as e:
-                    logger.error(f"Activity保存エラー (engagement_id: {engagement.get('engagement', {}).get('id')}): {str(e)}")
-                    continue
+            # 1. アクティビティマスタを保存
+            activities_rows, prepared = await asyncio.to_thread(self._prepare_activity_rows, records, now)
+            await self._executemany_chunked(cursor, ACTIVITIES_INSERT_SQL, activities_rows)
+
+            # 2. 保存されたactivity_idを一括取得
+            activity_ids = await self._fetch_activity_ids(cursor, [row[0] for row in activities_rows])
+
+            # 3. 詳細・関連付け・タイプ別テーブルを保存
+            detail_rows, saved_count = await asyncio.to_thread(self._prepare_detail_rows, prepared, activity_ids)
+            for sql, rows in detail_rows.items():
+                await self._executemany_chunked(cursor, sql, rows)
 
             await conn.commit()
 
+        logger.info(f"保存完了: {saved_count}/{total}件")
         return saved_count
 
+    async def _fetch_activity_ids(self, cursor, engagement_ids: List[str]) -> Dict[str, int]:
+        """hubspot_engagement_idからactivity_idへのマップをIN句でまとめて取得"""
+        activity_ids = {}
+        for start in range(0, len(engagement_ids), BATCH_SIZE):
+            chunk = engagement_ids[start:start + BATCH_SIZE]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            await cursor.execute(
+                f"SELECT id, hubspot_engagement_id FROM activities WHERE hubspot_engagement_id IN ({placeholders})",
+                chunk
+            )
+            for row in await cursor.fetchall():
+                activity_ids[row["hubspot_engagement_id"]] = row["id"]
+        return activity_ids
+
+    def _resolve_email_owner_id(self, engagement_id: str, associations: Dict[str, Any]) -> Optional[int]:
+        """EMAILアクティビティのownerIdを関連オブジェクトから取得（優先順位: contactIds > companyIds > dealIds）"""
+        logger.debug(f"EMAILアクティビティ {engagement_id}: associations={list(associations.keys())}")
+        for assoc_type in EMAIL_OWNER_ASSOCIATION_TYPES:
+            object_type = ASSOCIATION_OBJECT_TYPES[assoc_type]
+            if not associations.get(assoc_type):
+                continue
+            # 最初の関連オブジェクトのownerIdを取得
+            hubspot_object_id = str(associations[assoc_type][0])
+            obj = self._get_object(object_type, hubspot_object_id)
+            if not obj:
+                logger.debug(f"EMAILアクティビティ {engagement_id}: {object_type} hubspot_id={hubspot_object_id} に対応するobject_idが見つかりませんでした")
+                continue
+            object_id, object_owner_id = obj
+            if not object_owner_id:
+                logger.debug(f"EMAILアクティビティ {engagement_id}: {object_type} id={object_id} のhubspot_owner_idがNULLです")
+                continue
+            object_owner_id_str = str(object_owner_id)
+            owner_id = self._get_owner_id(object_owner_id_str)
+            if owner_id:
+                logger.info(f"EMAILアクティビティ {engagement_id} のownerIdを関連オブジェクト ({object_type}, id={object_id}, hubspot_owner_id={object_owner_id_str}) から取得: {owner_id}")
+                return owner_id
+            logger.warning(f"EMAILアクティビティ {engagement_id}: hubspot_owner_id={object_owner_id_str} に対応するowner_idが見つかりませんでした")
+        return None
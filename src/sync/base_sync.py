@@ -3,23 +3,179 @@
 """
 import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+from datetime import datetime, timedelta
 
-from src.database.connection import DatabaseConnection
-from src.hubspot.client import HubSpotBaseClient
+from src.database.connection import ACQUIRE_TIMEOUT, DatabaseConnection, SSDictCursor
+from src.hubspot.client import HubSpotBaseClient, hubspot_client
+from src.sync.converters import parse_epoch_seconds
 
 logger = logging.getLogger(__name__)
 
+# executemanyで一度に送信する行数
+BATCH_SIZE = 500
+
+# 先読みしておくHubSpot APIのページ数（保存中もこのページ数まで取得を進める）
+PREFETCH_PAGES = 10
+
+# sync()でまとめてsave_to_dbに渡す件数
+SAVE_CHUNK_SIZE = 1000
+
+# _executemany_concurrentlyで同時に使用する接続数の上限
+SAVE_CONCURRENCY = 4
+
+# 検索APIの1ページあたりの取得件数
+SEARCH_PAGE_LIMIT = 100
+
+# 検索APIでページングできる件数の上限（これを超える場合は最終更新日時で条件を進めて検索し直す）
+SEARCH_RESULT_LIMIT = 10000
+
+# 差分同期で前回の同期開始時刻からさかのぼる余裕（HubSpotとの時刻のずれ・反映遅延を吸収する）
+INCREMENTAL_SYNC_MARGIN = timedelta(minutes=5)
+
+LAST_SYNC_TIME_SQL = """
+    SELECT last_successful_sync_at
+    FROM sync_status
+    WHERE entity_type = %s
+"""
+
+SYNC_STATUS_UPSERT_SQL = """
+    INSERT INTO sync_status
+    (entity_type, last_sync_at, last_successful_sync_at, sync_status, error_message, records_synced)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        last_sync_at = VALUES(last_sync_at),
+        last_successful_sync_at = CASE
+            WHEN VALUES(sync_status) = 'success' THEN VALUES(last_successful_sync_at)
+            ELSE last_successful_sync_at
+        END,
+        sync_status = VALUES(sync_status),
+        error_message = VALUES(error_message),
+        records_synced = VALUES(records_synced),
+        updated_at = NOW()
+"""
+
+# ownerの対応表キャッシュの有効期間（秒）
+OWNER_CACHE_TTL = 300
+
+# ownersテーブルの変更検知用（件数と最終更新時刻）
+OWNER_FINGERPRINT_SQL = "SELECT COUNT(*) AS c, UNIX_TIMESTAMP(MAX(updated_at)) AS t FROM owners"
+
+OWNER_INDEX_SQL = "SELECT id, hubspot_id FROM owners"
+
+# パイプラインのHubSpot stage ID -> pipeline_stages.id の対応表
+# content_hashカラムの有無（add_content_hash_columns.sqlの適用確認）
+CONTENT_HASH_COLUMN_SQL = """
+    SELECT COUNT(*) AS c
+    FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'content_hash'
+"""
+
+PIPELINE_STAGE_INDEX_SQL = """
+    SELECT ps.id, ps.hubspot_stage_id
+    FROM pipeline_stages ps
+    JOIN pipelines p ON ps.pipeline_id = p.id
+    WHERE p.hubspot_id = %s
+"""
+
+
+def build_upsert_sql(table: str, columns: List[str]) -> str:
+    """
+    INSERT ... ON DUPLICATE KEY UPDATE文を組み立てる
+
+    columnsの先頭はユニークキー（hubspot_id）とし、VALUESの末尾にlast_synced_atを追加する。
+    updated_atにはNOW()ではなくlast_synced_atに渡した時刻を使い、バッチ内の行で同じ時刻にそろえる。
+    """
+    all_columns = list(columns) + ["last_synced_at"]
+    updates = [f"{column} = VALUES({column})" for column in all_columns[1:]]
+    updates.append("updated_at = VALUES(last_synced_at)")
+    return (
+        f"INSERT INTO {table} ({', '.join(all_columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(all_columns))}) "
+        f"ON DUPLICATE KEY UPDATE {', '.join(updates)}"
+    )
+
+
+def build_hashed_upsert_sql(table: str, columns: List[str]) -> str:
+    """
+    content_hashが変わった行だけを更新するINSERT ... ON DUPLICATE KEY UPDATE文を組み立てる
+
+    columnsの先頭はユニークキー（hubspot_id）とし、VALUESの末尾にcontent_hashとlast_synced_atを追加する。
+    ハッシュが一致する行はすべてのカラムを現在の値のまま残すため、MySQLは行もインデックスも書き込まない。
+    そのためlast_synced_at・updated_atは「HubSpotの値が最後に書き込まれた時刻」を表す
+    （同期が最後に成功した時刻はsync_status.last_successful_sync_atで管理する）。
+    MySQLは代入を左から順に評価するため、content_hashの更新は最後に行う。
+    updated_atはbuild_upsert_sqlと同じくlast_synced_atに渡した時刻にする。
+    """
+    all_columns = list(columns) + ["content_hash", "last_synced_at"]
+    unchanged = "content_hash <=> VALUES(content_hash)"
+    updates = [
+        f"{column} = IF({unchanged}, {column}, VALUES({column}))"
+        for column in columns[1:] + ["last_synced_at"]
+    ]
+    updates.append(f"updated_at = IF({unchanged}, updated_at, VALUES(last_synced_at))")
+    updates.append("content_hash = VALUES(content_hash)")
+    return (
+        f"INSERT INTO {table} ({', '.join(all_columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(all_columns))}) "
+        f"ON DUPLICATE KEY UPDATE {', '.join(updates)}"
+    )
+
 
 class BaseSync(ABC):
     """データ同期基底クラス"""
 
+    # HubSpot owner ID -> owners.id の対応表（全同期クラスで共有）
+    _owner_cache: Optional[Dict[str, int]] = None
+    _owner_cache_fingerprint: Optional[tuple] = None
+    _owner_cache_loaded_at: float = 0.0
+    # 同時に複数の保存処理が再読み込みしないようにするロック（イベントループ上で遅延生成）
+    _owner_cache_lock: Optional[asyncio.Lock] = None
+
+    # Trueのサブクラスは前回の同期以降に更新されたレコードだけを同期できる（modified_sinceを参照）
+    # save_to_dbは保存に成功した件数を返し、取得件数から保存件数と_skipped_countを引いた差分を保存失敗として扱う
+    supports_incremental: bool = False
+
+    # Trueのサブクラスはbuild_hashed_upsert_sqlでentity_typeと同名のテーブルに保存する
+    uses_content_hash: bool = False
+
     def __init__(self, entity_type: str):
         self.entity_type = entity_type
         self.client = HubSpotBaseClient()
         self.db = DatabaseConnection()
+        # sync()実行中に共有する(cursor, conn)
+        self._shared_cursor: Optional[Tuple[Any, Any]] = None
+        # 差分同期の基準時刻（Noneの場合は全件取得）
+        self.modified_since: Optional[datetime] = None
+        # 更新がないためsave_to_dbが保存を省いた件数（保存件数とは別に数える）
+        self._skipped_count = 0
+
+    @asynccontextmanager
+    async def _cursor(self, timeout: Optional[float] = ACQUIRE_TIMEOUT):
+        """
+        カーソルを取得（コンテキストマネージャー）
+
+        sync()の実行中は同期全体で1本の接続を共有し、呼び出しごとにプールから取得し直さない。
+        それ以外の場合はプールから接続を取得する。
+        """
+        if self._shared_cursor is not None:
+            yield self._shared_cursor
+            return
+        async with DatabaseConnection.get_cursor(timeout=timeout) as (cursor, conn):
+            yield cursor, conn
+
+    @asynccontextmanager
+    async def _shared_connection(self):
+        """sync()の間、_cursor()がプールから取得した1本の接続を返すようにする"""
+        async with DatabaseConnection.get_cursor() as shared_cursor:
+            self._shared_cursor = shared_cursor
+            try:
+                yield
+            finally:
+                self._shared_cursor = None
 
     @abstractmethod
     async def fetch_all(self) -> List[Dict[str, Any]]:
@@ -30,25 +186,295 @@ class BaseSync(ABC):
     async def save_to_db(self, records: List[Dict[str, Any]]) -> int:
         """データベースに保存"""
         pass
+
+    async def fetch_pages(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        HubSpotからデータをページ単位で取得
+
+        既定では全件を1ページとして返す。ページごとに保存したいサブクラスはオーバーライドし、
+        全件をメモリに保持せずに取得と保存を交互に行う。
+        """
+        yield await self.fetch_all()
     
+    async def _iter_prefetched(
+        self,
+        produce: Callable[["asyncio.Queue[Optional[List[Dict[str, Any]]]]"], Awaitable[None]],
+        maxsize: int = PREFETCH_PAGES
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        produceがキューに投入したページを順に返す
+
+        produceは別タスクで実行されるため、呼び出し側が現在のページを処理している間に
+        次のページのリクエストが進む。produceで発生した例外は最後に再送出される。
+        """
+        queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]" = asyncio.Queue(maxsize=maxsize)
+
+        async def run():
+            try:
+                await produce(queue)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await queue.put(None)
+                raise
+            await queue.put(None)
+
+        producer = asyncio.ensure_future(run())
+        try:
+            while True:
+                page = await queue.get()
+                if page is None:
+                    break
+                yield page
+            # 取得中のエラーはここで再送出される
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+
+    async def _produce_modified_search_pages(
+        self,
+        queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]",
+        object_type: str,
+        properties: List[str],
+        filters: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        modified_since以降に更新されたレコードを検索APIで最終更新日時の昇順に取得してキューに投入
+
+        検索APIは1つの条件でSEARCH_RESULT_LIMIT件までしか返さないため、上限に近づいたら
+        最後に取得した最終更新日時から検索し直す（境界の重複はUPSERTで吸収される）。
+        同一の最終更新日時のレコードが上限を超える場合は取りこぼしになるため、例外を送出する。
+
+        Args:
+            queue: ページを投入するキュー
+            object_type: HubSpotのオブジェクト種別（companies、dealsなど）
+            properties: 取得するプロパティ
+            filters: 最終更新日時に加えて適用する検索条件
+        """
+        since = int(self.modified_since.timestamp() * 1000)
+        properties = list(properties) + ["hs_lastmodifieddate"]
+        after = None
+        while True:
+            body = {
+                "filterGroups": [{
+                    "filters": list(filters or []) + [
+                        {"propertyName": "hs_lastmodifieddate", "operator": "GTE", "value": since}
+                    ]
+                }],
+                "sorts": [{"propertyName": "hs_lastmodifieddate", "direction": "ASCENDING"}],
+                "properties": properties,
+                "limit": SEARCH_PAGE_LIMIT
+            }
+            if after:
+                body["after"] = after
+
+            response = await self.client._make_request("POST", f"/crm/v3/objects/{object_type}/search", json=body)
+            results = response.get("results", [])
+            await queue.put(results)
+
+            paging = response.get("paging", {})
+            if not paging.get("next"):
+                break
+            after = paging["next"].get("after")
+
+            if after and int(after) + SEARCH_PAGE_LIMIT > SEARCH_RESULT_LIMIT and results:
+                last_modified = parse_epoch_seconds(results[-1].get("properties", {}).get("hs_lastmodifieddate"))
+                if last_modified is None or int(last_modified * 1000) <= since:
+                    raise RuntimeError(
+                        f"同一の最終更新日時の{self.entity_type}が{SEARCH_RESULT_LIMIT}件を超えるため取得できません"
+                    )
+                since = int(last_modified * 1000)
+                after = None
+
     def _log_progress(self, current: int, total: int, interval: int = 100):
-        """進捗ログを出力"""
-        if current % interval == 0 or current == total:
+        """進捗ログを出力（INFOが無効な場合は何もしない）"""
+        if (current % interval == 0 or current == total) and logger.isEnabledFor(logging.INFO):
             percentage = (current / total * 100) if total > 0 else 0
-            logger.info(f"進捗: {current}/{total}件 ({percentage:.1f}%)")
+            logger.info("進捗: %d/%d件 (%.1f%%)", current, total, percentage)
+
+    async def _executemany_chunked(
+        self,
+        cursor,
+        sql: str,
+        rows: List[tuple],
+        chunk_size: int = BATCH_SIZE,
+        log_progress: bool = False,
+        conn=None
+    ) -> int:
+        """
+        行をchunk_size件ずつexecutemanyで保存
+
+        aiomysql・asyncmyはVALUESが%sのみで構成されるINSERT文を複数行INSERTに書き換えるため、
+        1チャンクあたり1往復で送信される。チャンクが失敗した場合は1行ずつ再実行し、
+        不正な行だけをスキップする。log_progressがTrueの場合はチャンクごとに進捗を出力する。
+
+        connを渡した場合はチャンクごとにコミットし、トランザクションを1チャンク分に抑える
+        （失敗したチャンクはロールバックしてから1行ずつ再実行する）。
+
+        Returns:
+            保存に成功した行数
+        """
+        saved = 0
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                await cursor.executemany(sql, chunk)
+                if conn is not None:
+                    await conn.commit()
+                saved += len(chunk)
+            except Exception as e:
+                logger.warning(f"一括保存に失敗したため1行ずつ再実行します（{len(chunk)}件）: {str(e)}")
+                if conn is not None:
+                    await conn.rollback()
+                for row in chunk:
+                    try:
+                        await cursor.execute(sql, row)
+                        saved += 1
+                    except Exception as row_error:
+                        logger.error(f"{self.entity_type}保存エラー: {str(row_error)}")
+                if conn is not None:
+                    await conn.commit()
+            if log_progress:
+                self._log_progress(start + len(chunk), len(rows), chunk_size)
+        return saved
+
+    async def _executemany_concurrently(
+        self,
+        sql: str,
+        rows: List[tuple],
+        concurrency: int = SAVE_CONCURRENCY
+    ) -> int:
+        """
+        行を最大concurrency個に分割し、それぞれ別の接続で並行してexecutemanyで保存
+
+        各ワーカーはプールから専用の接続を取得し、_executemany_chunkedでチャンクごとにコミットする。
+        行数が1チャンク以下の場合は接続を増やしても効果がないため、1本の接続で保存する。
+
+        Returns:
+            保存に成功した行数
+        """
+        if not rows:
+            return 0
+        workers = max(1, min(concurrency, -(-len(rows) // BATCH_SIZE)))
+        if workers == 1:
+            async with self._cursor() as (cursor, conn):
+                return await self._executemany_chunked(cursor, sql, rows, conn=conn)
+
+        shard_size = -(-len(rows) // workers)
+
+        async def write(shard: List[tuple]) -> int:
+            async with DatabaseConnection.get_cursor() as (cursor, conn):
+                return await self._executemany_chunked(cursor, sql, shard, conn=conn)
+
+        results = await asyncio.gather(*(
+            write(rows[start:start + shard_size]) for start in range(0, len(rows), shard_size)
+        ))
+        return sum(results)
+
+    @staticmethod
+    async def _stream_rows(conn, sql: str, size: int = BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+        """
+        サーバー側カーソルでクエリ結果を1行ずつ返す
+
+        結果全体をクライアント側にバッファしないため、大きなテーブルの読み込みでもメモリが一定になる。
+        読み終わるまで同じ接続で他のクエリは実行できない。
+        """
+        async with conn.cursor(SSDictCursor) as cursor:
+            await cursor.execute(sql)
+            while True:
+                rows = await cursor.fetchmany(size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+
+    @classmethod
+    def invalidate_owner_cache(cls) -> None:
+        """ownerの対応表キャッシュを破棄（owners同期後に呼び出す）"""
+        BaseSync._owner_cache = None
+        BaseSync._owner_cache_fingerprint = None
+        BaseSync._owner_cache_loaded_at = 0.0
+
+    async def _get_owner_map(self, cursor) -> Dict[str, int]:
+        """
+        HubSpot owner IDからデータベースのowner IDへの対応表を取得
+
+        対応表はプロセス内で全同期クラス共通にキャッシュする。ownersテーブルの件数と最終更新時刻を
+        フィンガープリントとして毎回確認し、変化がなくOWNER_CACHE_TTL秒以内であれば
+        ownersテーブルを再読み込みせずにキャッシュを返す。
+        複数の保存処理が同時に呼び出しても、ownersテーブルの再読み込みは1回だけ行われる。
+
+        Args:
+            cursor: カーソル
+
+        Returns:
+            HubSpot owner ID（文字列） -> owners.id の辞書
+        """
+        if BaseSync._owner_cache_lock is None:
+            BaseSync._owner_cache_lock = asyncio.Lock()
+        async with BaseSync._owner_cache_lock:
+            return await self._load_owner_map(cursor)
+
+    async def _load_owner_map(self, cursor) -> Dict[str, int]:
+        """キャッシュが有効ならそれを返し、無効ならownersテーブルから対応表を読み込む"""
+        fingerprint = None
+        try:
+            await cursor.execute(OWNER_FINGERPRINT_SQL)
+            row = await cursor.fetchone()
+            if row:
+                fingerprint = (row["c"], row["t"])
+        except Exception as e:
+            logger.warning(f"Ownerフィンガープリント取得エラー: {str(e)}")
+
+        cache = BaseSync._owner_cache
+        if (
+            cache is not None
+            and fingerprint is not None
+            and fingerprint == BaseSync._owner_cache_fingerprint
+            and time.monotonic() - BaseSync._owner_cache_loaded_at < OWNER_CACHE_TTL
+        ):
+            return cache
+
+        owner_map = {}
+        try:
+            await cursor.execute(OWNER_INDEX_SQL)
+            for row in await cursor.fetchall():
+                owner_map[str(row["hubspot_id"])] = row["id"]
+        except Exception as e:
+            logger.warning(f"Owner ID一覧の取得エラー: {str(e)}")
+            return owner_map
+
+        BaseSync._owner_cache = owner_map
+        BaseSync._owner_cache_fingerprint = fingerprint
+        BaseSync._owner_cache_loaded_at = time.monotonic()
+        return owner_map
+
+    async def _get_pipeline_stage_map(self, cursor, pipeline_id: str) -> Dict[str, int]:
+        """
+        パイプラインのHubSpot stage IDからデータベースのpipeline_stage IDへの対応表を取得
+
+        Args:
+            cursor: カーソル
+            pipeline_id: HubSpotのパイプラインID
+
+        Returns:
+            HubSpot stage ID（文字列） -> pipeline_stages.id の辞書
+        """
+        stage_map = {}
+        try:
+            await cursor.execute(PIPELINE_STAGE_INDEX_SQL, (pipeline_id,))
+            for row in await cursor.fetchall():
+                stage_map[str(row["hubspot_stage_id"])] = row["id"]
+        except Exception as e:
+            logger.warning(f"Pipeline Stage ID一覧の取得エラー (pipeline_id: {pipeline_id}): {str(e)}")
+        return stage_map
 
     async def get_last_sync_time(self) -> Optional[datetime]:
         """最後の同期時刻を取得"""
         try:
-            async with DatabaseConnection.get_cursor() as (cursor, conn):
-                await cursor.execute(
-                    """
-                    SELECT last_successful_sync_at 
-                    FROM sync_status 
-                    WHERE entity_type = %s
-                    """,
-                    (self.entity_type,)
-                )
+            async with self._cursor() as (cursor, conn):
+                await cursor.execute(LAST_SYNC_TIME_SQL, (self.entity_type,))
                 result = await cursor.fetchone()
                 if result and result.get("last_successful_sync_at"):
                     return result["last_successful_sync_at"]
@@ -57,31 +483,42 @@ class BaseSync(ABC):
             logger.error(f"最後の同期時刻の取得に失敗: {str(e)}")
             return None
 
-    async def update_sync_status(self, status: str, records_count: int = 0, error_message: Optional[str] = None):
-        """同期状態を更新"""
+    async def _check_content_hash_column(self) -> None:
+        """content_hashカラムがない場合は全行の保存が失敗するため、同期を始める前に例外を送出する"""
+        async with self._cursor() as (cursor, conn):
+            await cursor.execute(CONTENT_HASH_COLUMN_SQL, (self.entity_type,))
+            row = await cursor.fetchone()
+        if not row or not row["c"]:
+            raise RuntimeError(
+                f"{self.entity_type}テーブルにcontent_hashカラムがありません"
+                "（database/add_content_hash_columns.sqlを実行してください）"
+            )
+
+    async def update_sync_status(
+        self,
+        status: str,
+        records_count: int = 0,
+        error_message: Optional[str] = None,
+        synced_at: Optional[datetime] = None,
+        own_connection: bool = False
+    ):
+        """
+        同期状態を更新
+
+        successの場合、last_successful_sync_atにはsynced_at（省略時は現在時刻）を記録する。
+        own_connectionがTrueの場合はsync()の共有接続ではなくプールから取得した接続を使い、
+        共有接続を使う処理と並行して実行できるようにする。
+        """
         try:
-            async with DatabaseConnection.get_cursor() as (cursor, conn):
+            cursor_context = DatabaseConnection.get_cursor() if own_connection else self._cursor()
+            async with cursor_context as (cursor, conn):
                 now = datetime.now()
                 await cursor.execute(
-                    """
-                    INSERT INTO sync_status 
-                    (entity_type, last_sync_at, last_successful_sync_at, sync_status, error_message, records_synced)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                        last_sync_at = VALUES(last_sync_at),
-                        last_successful_sync_at = CASE 
-                            WHEN VALUES(sync_status) = 'success' THEN VALUES(last_successful_sync_at)
-                            ELSE last_successful_sync_at
-                        END,
-                        sync_status = VALUES(sync_status),
-                        error_message = VALUES(error_message),
-                        records_synced = VALUES(records_synced),
-                        updated_at = NOW()
-                    """,
+                    SYNC_STATUS_UPSERT_SQL,
                     (
                         self.entity_type,
                         now,
-                        now if status == "success" else None,
+                        (synced_at or now) if status == "success" else None,
                         status,
                         error_message,
                         records_count
@@ -91,38 +528,97 @@ class BaseSync(ABC):
         except Exception as e:
             logger.error(f"同期状態の更新に失敗: {str(e)}")
 
-    async def sync(self) -> bool:
-        """データ同期を実行"""
-        import time
+    async def sync(self, full_sync: bool = False) -> bool:
+        """
+        データ同期を実行
+
+        supports_incrementalのサブクラスは、full_syncでない限り前回の同期開始時刻
+        （INCREMENTAL_SYNC_MARGIN分さかのぼる）以降に更新されたレコードだけを同期する。
+        """
         start_time = time.time()
+        started_at = datetime.now()
         logger.info(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
         logger.info(f"🔄 {self.entity_type}の同期を開始します...")
         logger.info(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
 
         try:
-            # 同期状態を更新
-            await self.update_sync_status("running", 0)
+            # 同期状態の更新・対応表の読み込み・保存は1本の接続で行う
+            async with self._shared_connection():
+                if self.uses_content_hash:
+                    await self._check_content_hash_column()
 
-            # HubSpotからデータを取得
-            fetch_start = time.time()
-            records = await self.fetch_all()
-            fetch_time = time.time() - fetch_start
-            logger.info(f"✅ {len(records)}件の{self.entity_type}を取得しました（取得時間: {fetch_time:.1f}秒）")
+                self.modified_since = None
+                self._skipped_count = 0
+                if self.supports_incremental and not full_sync:
+                    last_sync_time = await self.get_last_sync_time()
+                    if last_sync_time:
+                        self.modified_since = last_sync_time - INCREMENTAL_SYNC_MARGIN
+                        logger.info(f"{self.modified_since}以降に更新された{self.entity_type}を差分同期します")
 
-            # データベースに保存
-            save_start = time.time()
-            saved_count = await self.save_to_db(records)
-            save_time = time.time() - save_start
-            logger.info(f"✅ {saved_count}件の{self.entity_type}を保存しました（保存時間: {save_time:.1f}秒）")
+                # 同期状態の更新は専用の接続で行い、HubSpotからの最初の取得と並行させる
+                # （共有の接続は複数のコルーチンから同時に使えないため）
+                running_status = asyncio.ensure_future(
+                    self.update_sync_status("running", 0, own_connection=True)
+                )
 
-            # 同期状態を更新
-            await self.update_sync_status("success", saved_count)
+                # HubSpotからページ単位で取得し、SAVE_CHUNK_SIZE件たまるごとにデータベースに保存する
+                # （保存中も次のページの取得はバックグラウンドで進む）
+                fetched_count = 0
+                saved_count = 0
+                fetch_time = 0.0
+                save_time = 0.0
+                buffer: List[Dict[str, Any]] = []
 
-            total_time = time.time() - start_time
-            logger.info(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-            logger.info(f"✅ {self.entity_type}の同期が完了しました（合計時間: {total_time:.1f}秒）")
-            logger.info(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-            return True
+                async def flush():
+                    nonlocal saved_count, save_time, buffer
+                    save_start = time.time()
+                    saved_count += await self.save_to_db(buffer)
+                    save_time += time.time() - save_start
+                    buffer = []
+
+                try:
+                    # 同期中のHubSpot APIリクエストは1つのHTTPクライアント（接続プール）を共有する
+                    async with hubspot_client():
+                        pages = self.fetch_pages()
+                        try:
+                            fetch_start = time.time()
+                            async for records in pages:
+                                fetch_time += time.time() - fetch_start
+                                fetched_count += len(records)
+                                buffer.extend(records)
+                                if len(buffer) >= SAVE_CHUNK_SIZE:
+                                    await flush()
+                                fetch_start = time.time()
+                            fetch_time += time.time() - fetch_start
+                        finally:
+                            await pages.aclose()
+
+                        if buffer:
+                            await flush()
+                finally:
+                    # 成功・失敗の記録がrunningで上書きされないよう、先に完了を待つ
+                    await running_status
+
+                logger.info(f"✅ {fetched_count}件の{self.entity_type}を取得しました（取得時間: {fetch_time:.1f}秒）")
+                logger.info(f"✅ {saved_count}件の{self.entity_type}を保存しました（保存時間: {save_time:.1f}秒）")
+                if self._skipped_count:
+                    logger.info(f"✅ 更新がない{self._skipped_count}件の{self.entity_type}は保存を省きました")
+
+                # 次回の差分同期は今回の開始時刻以降しか取得しないため、保存に失敗した行があれば
+                # 成功として記録せず、last_successful_sync_atを進めない（次回も同じ範囲から取得し直す）
+                failed_count = fetched_count - saved_count - self._skipped_count
+                if self.supports_incremental and failed_count > 0:
+                    raise RuntimeError(f"{failed_count}件の{self.entity_type}の保存に失敗しました")
+
+                # 同期状態を更新
+                # 同期中の更新を取りこぼさないよう、次回の差分同期は今回の開始時刻を基準にする
+                await self.update_sync_status("success", saved_count, synced_at=started_at)
+
+                total_time = time.time() - start_time
+                logger.info(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+                logger.info(f"✅ {self.entity_type}の同期が完了しました（合計時間: {total_time:.1f}秒）")
+                logger.info(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+                return True
 
         except Exception as e:
             total_time = time.time() - start_time
@@ -1,170 +1,148 @@
 """
 HubSpot Companies同期処理
 """
+import asyncio
 import logging
-import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional
 from datetime import datetime
 
-from src.sync.base_sync import BaseSync
-from src.database.connection import DatabaseConnection
+from src.sync.base_sync import BaseSync, build_hashed_upsert_sql
+from src.sync.converters import content_hash, convert_select_property
 
 logger = logging.getLogger(__name__)
 
+# companies APIの1ページあたりの取得件数
+PAGE_LIMIT = 100
+
+# 保存するカラム（_company_to_rowの値の順序と一致させる）
+COMPANIES_COLUMNS = [
+    "hubspot_id", "name", "company_state", "company_city", "company_address", "company_channel",
+    "company_memo", "phone", "company_buy_phase", "company_sell_phase", "hubspot_owner_id",
+    "company_follow_rank", "company_list_exclusion", "company_property_type", "company_buy_or_sell",
+    "company_industry", "company_area", "company_gross2"
+]
+
+# HubSpotから取得するプロパティ（保存するカラムのみを指定してレスポンスを小さくする）
+COMPANIES_PROPERTIES = ",".join(COMPANIES_COLUMNS[1:])
+
+# VALUESは%sのみで構成されるため、executemanyで複数行INSERTに書き換えられる
+# （content_hashが変わらない行は書き込まない）
+COMPANIES_INSERT_SQL = build_hashed_upsert_sql("companies", COMPANIES_COLUMNS)
+
 
 class CompaniesSync(BaseSync):
     """Companies同期クラス"""
 
+    supports_incremental = True
+    uses_content_hash = True
+
     def __init__(self):
         super().__init__("companies")
+        # HubSpot owner ID -> owners.id
+        self._owner_map: Dict[str, int] = {}
 
-    async def fetch_all(self) -> List[Dict[str, Any]]:
-        """HubSpotから全companiesを取得"""
-        companies = []
+    async def _produce_pages(self, queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]") -> None:
+        """companiesのページを順に取得してキューに投入"""
         after = None
-        limit = 100
+        while True:
+            params = {"limit": PAGE_LIMIT, "properties": COMPANIES_PROPERTIES}
+            if after:
+                params["after"] = after
 
-        try:
-            while True:
-                params = {"limit": limit}
-                if after:
-                    params["after"] = after
+            response = await self.client._make_request("GET", "/crm/v3/objects/companies", params=params)
+            await queue.put(response.get("results", []))
 
-                # すべてのプロパティを取得
-                response = await self.client._make_request("GET", "/crm/v3/objects/companies", params=params)
-                results = response.get("results", [])
-                companies.extend(results)
+            # ページネーションの確認
+            paging = response.get("paging", {})
+            if not paging.get("next"):
+                break
+            after = paging["next"].get("after")
 
-                logger.info(f"取得中: {len(companies)}件...")
+    async def _produce_modified_pages(self, queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]") -> None:
+        """modified_since以降に更新されたcompaniesを検索APIで取得してキューに投入"""
+        await self._produce_modified_search_pages(queue, "companies", COMPANIES_COLUMNS[1:])
 
-                # ページネーションの確認
-                paging = response.get("paging", {})
-                if not paging.get("next"):
-                    break
-                after = paging["next"].get("after")
+    async def fetch_pages(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        """HubSpotからcompaniesをページ単位で取得（次のページの取得を前のページの保存と並行して行う）"""
+        fetched_count = 0
 
-            logger.info(f"HubSpotから{len(companies)}件のcompaniesを取得しました")
+        try:
+            # 前回の同期時刻がある場合は更新されたcompaniesのみ取得する
+            produce = self._produce_modified_pages if self.modified_since else self._produce_pages
+            async for results in self._iter_prefetched(produce):
+                fetched_count += len(results)
+                logger.info(f"取得中: {fetched_count}件...")
+                if results:
+                    yield results
+
+            logger.info(f"HubSpotから{fetched_count}件のcompaniesを取得しました")
         except Exception as e:
             logger.error(f"HubSpot Companies取得エラー: {str(e)}")
             raise
 
-        return companies
-
-    def _convert_select_property(self, value: Any) -> Optional[str]:
-        """選択式プロパティをJSON配列形式に変換"""
-        if value is None:
-            return None
-        if isinstance(value, list):
-            # 既に配列の場合はそのままJSONに変換
-            return json.dumps(value)
-        if isinstance(value, str):
-            # セミコロン区切りの場合は配列に変換
-            if ";" in value:
-                values = [v.strip() for v in value.split(";") if v.strip()]
-                return json.dumps(values) if values else None
-            # 単一値の場合は配列に変換
-            return json.dumps([value])
-        # その他の場合は文字列に変換して配列に
-        return json.dumps([str(value)])
-
-    async def _get_owner_id(self, hubspot_owner_id: Optional[str]) -> Optional[int]:
-        """HubSpot owner IDからデータベースのowner IDを取得"""
+    async def fetch_all(self) -> List[Dict[str, Any]]:
+        """HubSpotから全companiesを取得"""
+        return [company async for page in self.fetch_pages() for company in page]
+
+    # 選択式プロパティをJSON配列形式に変換
+    _convert_select_property = staticmethod(convert_select_property)
+
+    def _company_to_row(self, company: Dict[str, Any]) -> tuple:
+        """companyをCOMPANIES_COLUMNSの順の値に変換"""
+        properties = company.get("properties", {})
+        # 行ごとに多数回呼び出すため、属性・メソッドの参照をローカル変数に束縛しておく
+        get = properties.get
+        convert = convert_select_property
+        return (
+            company.get("id"),
+            get("name"),
+            convert(get("company_state")),
+            get("company_city"),
+            get("company_address"),
+            convert(get("company_channel")),
+            get("company_memo"),
+            get("phone"),
+            convert(get("company_buy_phase")),
+            convert(get("company_sell_phase")),
+            self._get_owner_id(get("hubspot_owner_id")),
+            convert(get("company_follow_rank")),
+            convert(get("company_list_exclusion")),
+            convert(get("company_property_type")),
+            convert(get("company_buy_or_sell")),
+            convert(get("company_industry")),
+            convert(get("company_area")),
+            convert(get("company_gross2"))
+        )
+
+    def _get_owner_id(self, hubspot_owner_id: Optional[str]) -> Optional[int]:
+        """HubSpot owner IDからデータベースのowner IDを取得（save_to_dbで読み込んだ対応表を参照）"""
         if not hubspot_owner_id:
             return None
-
-        try:
-            async with DatabaseConnection.get_cursor() as (cursor, conn):
-                await cursor.execute(
-                    "SELECT id FROM owners WHERE hubspot_id = %s",
-                    (str(hubspot_owner_id),)
-                )
-                result = await cursor.fetchone()
-                if result:
-                    return result.get("id")
-                return None
-        except Exception as e:
-            logger.warning(f"Owner ID取得エラー (hubspot_id: {hubspot_owner_id}): {str(e)}")
-            return None
+        return self._owner_map.get(str(hubspot_owner_id))
 
     async def save_to_db(self, records: List[Dict[str, Any]]) -> int:
-        """データベースに保存"""
-        saved_count = 0
-        total = len(records)
-        logger.info(f"データベースへの保存を開始します（全{total}件）")
-
-        async with DatabaseConnection.get_cursor() as (cursor, conn):
-            for idx, company in enumerate(records, 1):
-                if idx % 100 == 0 or idx == total:
-                    percentage = (idx / total * 100) if total > 0 else 0
-                    logger.info(f"保存進捗: {idx}/{total}件 ({percentage:.1f}%)")
+        """データベースに保存（executemanyによる一括保存）"""
+        logger.info("データベースへの保存を開始します（全%d件）", len(records))
+        now = datetime.now()
+
+        async with self._cursor() as (cursor, conn):
+            # ownerの対応表を取得（ownersに変更がなければキャッシュを再利用）
+            self._owner_map = await self._get_owner_map(cursor)
+
+            # 保存する行を先にすべて組み立て、DBへの書き込みはexecutemanyのみにする
+            rows = []
+            append = rows.append
+            to_row = self._company_to_row
+            for company in records:
                 try:
-                    hubspot_id = company.get("id")
-                    properties = company.get("properties", {})
-
-                    # 基本情報
-                    name = properties.get("name")
-                    company_state = self._convert_select_property(properties.get("company_state"))
-                    company_city = properties.get("company_city")
-                    company_address = properties.get("company_address")
-                    company_channel = self._convert_select_property(properties.get("company_channel"))
-                    company_memo = properties.get("company_memo")
-                    phone = properties.get("phone")
-                    company_buy_phase = self._convert_select_property(properties.get("company_buy_phase"))
-                    company_sell_phase = self._convert_select_property(properties.get("company_sell_phase"))
-                    hubspot_owner_id_str = properties.get("hubspot_owner_id")
-                    hubspot_owner_id = await self._get_owner_id(hubspot_owner_id_str) if hubspot_owner_id_str else None
-                    company_follow_rank = self._convert_select_property(properties.get("company_follow_rank"))
-                    company_list_exclusion = self._convert_select_property(properties.get("company_list_exclusion"))
-                    company_property_type = self._convert_select_property(properties.get("company_property_type"))
-                    company_buy_or_sell = self._convert_select_property(properties.get("company_buy_or_sell"))
-                    company_industry = self._convert_select_property(properties.get("company_industry"))
-                    company_area = self._convert_select_property(properties.get("company_area"))
-                    company_gross2 = self._convert_select_property(properties.get("company_gross2"))
-
-                    await cursor.execute(
-                        """
-                        INSERT INTO companies 
-                        (hubspot_id, name, company_state, company_city, company_address, company_channel, 
-                         company_memo, phone, company_buy_phase, company_sell_phase, hubspot_owner_id,
-                         company_follow_rank, company_list_exclusion, company_property_type, company_buy_or_sell,
-                         company_industry, company_area, company_gross2, last_synced_at)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
-                        ON DUPLICATE KEY UPDATE
-                            name = VALUES(name),
-                            company_state = VALUES(company_state),
-                            company_city = VALUES(company_city),
-                            company_address = VALUES(company_address),
-                            company_channel = VALUES(company_channel),
-                            company_memo = VALUES(company_memo),
-                            phone = VALUES(phone),
-                            company_buy_phase = VALUES(company_buy_phase),
-                            company_sell_phase = VALUES(company_sell_phase),
-                            hubspot_owner_id = VALUES(hubspot_owner_id),
-                            company_follow_rank = VALUES(company_follow_rank),
-                            company_list_exclusion = VALUES(company_list_exclusion),
-                            company_property_type = VALUES(company_property_type),
-                            company_buy_or_sell = VALUES(company_buy_or_sell),
-                            company_industry = VALUES(company_industry),
-                            company_area = VALUES(company_area),
-                            company_gross2 = VALUES(company_gross2),
-                            last_synced_at = NOW(),
-                            updated_at = NOW()
-                        """,
-                        (
-                            hubspot_id, name, company_state, company_city, company_address, company_channel,
-                            company_memo, phone, company_buy_phase, company_sell_phase, hubspot_owner_id,
-                            company_follow_rank, company_list_exclusion, company_property_type, company_buy_or_sell,
-                            company_industry, company_area, company_gross2
-                        )
-                    )
-                    saved_count += 1
-
+                    values = to_row(company)
+                    append(values + (content_hash(values), now))
                 except Exception as e:
                     logger.error(f"Company保存エラー (hubspot_id: {company.get('id')}): {str(e)}")
-                    continue
 
-            await conn.commit()
+            # チャンクごとにコミットし、トランザクションとundoログを小さく保つ
+            saved_count = await self._executemany_chunked(
+                cursor, COMPANIES_INSERT_SQL, rows, log_progress=True, conn=conn
+            )
 
         return saved_count
-
-
@@ -1,317 +1,246 @@
 """
 HubSpot Contacts同期処理
 """
+import asyncio
 import logging
-import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Tuple
 from datetime import datetime
 
-from src.sync.base_sync import BaseSync
-from src.database.connection import DatabaseConnection
+from src.sync.base_sync import BaseSync, build_hashed_upsert_sql
+from src.sync.converters import (
+    content_hash, convert_select_property, parse_datetime, parse_epoch_seconds, parse_float
+)
 
 logger = logging.getLogger(__name__)
 
+# contacts APIの1ページあたりの取得件数
+PAGE_LIMIT = 100
+
+# 保存するカラムと値の変換方法（プロパティ名はカラム名と同じ）
+#   text: そのまま / email: NOT NULLのためNoneを空文字列に / select: JSON配列 /
+#   datetime: datetime / owner: owners.id / float: 数値
+CONTACTS_COLUMNS = [
+    ("lastname", "text"),
+    ("firstname", "text"),
+    ("email", "email"),
+    ("phone", "text"),
+    ("phone2", "text"),
+    ("contact_state", "select"),
+    ("contact_city", "text"),
+    ("became_a_partner_date", "datetime"),
+    ("contractor_memo", "text"),
+    ("contractor_channel", "select"),
+    ("contractor_last_url_click", "datetime"),
+    ("hubspot_owner_id", "owner"),
+    ("hubspot_old_owner_id", "owner"),
+    ("contact_sales_outbound", "owner"),
+    ("contractor_follow_rank", "select"),
+    ("contractor_buy_phase", "select"),
+    ("contractor_buy_phase_date", "datetime"),
+    ("contractor_sell_phase", "select"),
+    ("contractor_sell_phase_date", "datetime"),
+    ("contractor_industry", "select"),
+    ("contractor_property_type", "select"),
+    ("contractor_buy_or_sell", "select"),
+    ("contractor_ap", "select"),
+    ("contractor_type", "select"),
+    ("affiliation", "select"),
+    ("graduate_experience", "select"),
+    ("contractor_broker", "select"),
+    ("information_acquisition_route", "select"),
+    ("property_information_share", "select"),
+    ("contractor_area", "select"),
+    ("contractor_area_category", "select"),
+    ("contractor_gross2", "select"),
+    ("assessment_community", "select"),
+    ("assessment_community_detail", "text"),
+    ("increase_referrals", "select"),
+    ("ap_number", "select"),
+    ("ap_achievement", "select"),
+    ("information_matchmaking", "select"),
+    ("personal_sales", "select"),
+    ("santame", "select"),
+    ("ap_conditions", "select"),
+    ("decision_flow", "select"),
+    ("contact_service_area", "select"),
+    ("contact_area_details", "text"),
+    ("contact_sales_gross", "select"),
+    ("contact_own_funds", "select"),
+    ("contractor_yield", "text"),
+    ("contact_yield", "select"),
+    ("contractor_bank", "select"),
+    ("contact_station_distance", "select"),
+    ("contact_building_age", "select"),
+    ("contact_building_structure", "select"),
+    ("contact_supplement", "text"),
+    ("associatedcompanyid", "float")
+]
+
+# HubSpotから取得するプロパティ（必要なプロパティを明示的に指定。特にhubspot_owner_idを含める）
+CONTACTS_PROPERTIES = ",".join(column for column, _ in CONTACTS_COLUMNS)
+
+# VALUESは%sのみで構成されるため、executemanyで複数行INSERTに書き換えられる
+# （content_hashが変わらない行は書き込まない）
+CONTACTS_INSERT_SQL = build_hashed_upsert_sql("contacts", ["hubspot_id"] + [column for column, _ in CONTACTS_COLUMNS])
+
+# ownerを参照するカラム
+CONTACTS_OWNER_COLUMNS = [column for column, kind in CONTACTS_COLUMNS if kind == "owner"]
+
+# ownerのカラムがNULLの連絡先（保存時にownerが未同期だった連絡先は、HubSpotで更新がなくても変換し直す）
+CONTACTS_MISSING_OWNER_SQL = (
+    "SELECT hubspot_id, " + ", ".join(f"{column} IS NULL AS {column}" for column in CONTACTS_OWNER_COLUMNS)
+    + " FROM contacts WHERE " + " OR ".join(f"{column} IS NULL" for column in CONTACTS_OWNER_COLUMNS)
+)
+
+
+def _email_or_empty(value: Any) -> str:
+    """emailはNOT NULLのためNoneを空文字列に変換"""
+    return value or ""
+
 
 class ContactsSync(BaseSync):
     """Contacts同期クラス"""
 
+    # contacts一覧APIは全件を返すため、modified_sinceより前に更新された連絡先は変換・保存を省く
+    supports_incremental = True
+    uses_content_hash = True
+
     def __init__(self):
         super().__init__("contacts")
+        # HubSpot owner ID -> owners.id
+        self._owner_map: Dict[str, int] = {}
+        # HubSpot contact ID -> ownerがNULLのカラム。同期ごとに1回だけ読み込む
+        self._missing_owner: Optional[Dict[str, Tuple[str, ...]]] = None
 
-    async def fetch_all(self) -> List[Dict[str, Any]]:
-        """HubSpotから全contactsを取得"""
-        contacts = []
+    async def _produce_pages(self, queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]") -> None:
+        """contactsのページを順に取得してキューに投入"""
         after = None
-        limit = 100
+        while True:
+            params = {"limit": PAGE_LIMIT, "properties": CONTACTS_PROPERTIES}
+            if after:
+                params["after"] = after
+
+            # プロパティを指定して取得
+            response = await self.client._make_request("GET", "/crm/v3/objects/contacts", params=params)
+            await queue.put(response.get("results", []))
+
+            # ページネーションの確認
+            paging = response.get("paging", {})
+            if not paging.get("next"):
+                break
+            after = paging["next"].get("after")
+
+    async def fetch_pages(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        """HubSpotからcontactsをページ単位で取得（次のページの取得を前のページの保存と並行して行う）"""
+        fetched_count = 0
 
         try:
-            while True:
-                params = {
-                    "limit": limit,
-                    # 必要なプロパティを明示的に指定（特にhubspot_owner_idを含める）
-                    "properties": ",".join([
-                        "firstname", "lastname", "email", "phone", "phone2",
-                        "contact_state", "contact_city", "became_a_partner_date",
-                        "contractor_memo", "contractor_channel", "contractor_last_url_click",
-                        "hubspot_owner_id", "hubspot_old_owner_id", "contact_sales_outbound",
-                        "contractor_follow_rank", "contractor_buy_phase", "contractor_buy_phase_date",
-                        "contractor_sell_phase", "contractor_sell_phase_date", "contractor_industry",
-                        "contractor_property_type", "contractor_buy_or_sell", "contractor_ap",
-                        "contractor_type", "affiliation", "graduate_experience", "contractor_broker",
-                        "information_acquisition_route", "property_information_share", "contractor_area",
-                        "contractor_area_category", "contractor_gross2", "assessment_community",
-                        "assessment_community_detail", "increase_referrals", "ap_number", "ap_achievement",
-                        "information_matchmaking", "personal_sales", "santame", "ap_conditions",
-                        "decision_flow", "contact_service_area", "contact_area_details", "contact_sales_gross",
-                        "contact_own_funds", "contractor_yield", "contact_yield", "contractor_bank",
-                        "contact_station_distance", "contact_building_age", "contact_building_structure",
-                        "contact_supplement", "associatedcompanyid"
-                    ])
-                }
-                if after:
-                    params["after"] = after
-
-                # プロパティを指定して取得
-                response = await self.client._make_request("GET", "/crm/v3/objects/contacts", params=params)
-                results = response.get("results", [])
-                contacts.extend(results)
-
-                logger.info(f"取得中: {len(contacts)}件...")
-
-                # ページネーションの確認
-                paging = response.get("paging", {})
-                if not paging.get("next"):
-                    break
-                after = paging["next"].get("after")
-
-            logger.info(f"HubSpotから{len(contacts)}件のcontactsを取得しました")
+            async for results in self._iter_prefetched(self._produce_pages):
+                fetched_count += len(results)
+                logger.info(f"取得中: {fetched_count}件...")
+                if results:
+                    yield results
+
+            logger.info(f"HubSpotから{fetched_count}件のcontactsを取得しました")
         except Exception as e:
             logger.error(f"HubSpot Contacts取得エラー: {str(e)}")
             raise
 
-        return contacts
-
-    def _convert_select_property(self, value: Any) -> Optional[str]:
-        """選択式プロパティをJSON配列形式に変換"""
-        if value is None:
-            return None
-        if isinstance(value, list):
-            return json.dumps(value)
-        if isinstance(value, str):
-            if ";" in value:
-                values = [v.strip() for v in value.split(";") if v.strip()]
-                return json.dumps(values) if values else None
-            return json.dumps([value])
-        return json.dumps([str(value)])
-
-    def _parse_datetime(self, value: Any) -> Optional[datetime]:
-        """日時文字列をdatetimeに変換"""
-        if not value:
-            return None
-        if isinstance(value, datetime):
-            return value
-        if isinstance(value, (int, float)):
-            try:
-                return datetime.fromtimestamp(value / 1000)
-            except:
-                return None
-        if isinstance(value, str):
-            try:
-                # ISO形式やその他の形式を試す
-                for fmt in ["%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
-                    try:
-                        return datetime.strptime(value, fmt)
-                    except:
-                        continue
-            except:
-                pass
-        return None
+    async def fetch_all(self) -> List[Dict[str, Any]]:
+        """HubSpotから全contactsを取得"""
+        return [contact async for page in self.fetch_pages() for contact in page]
 
-    async def _get_owner_id(self, hubspot_owner_id: Optional[str]) -> Optional[int]:
-        """HubSpot owner IDからデータベースのowner IDを取得"""
-        if not hubspot_owner_id:
-            return None
+    # 選択式プロパティをJSON配列形式に変換（文字列の変換結果はキャッシュされる）
+    _convert_select_property = staticmethod(convert_select_property)
 
+    def _parse_datetime(self, value: Any) -> Optional[datetime]:
+        """日時文字列をdatetimeに変換（fromisoformatで解釈し、失敗した場合のみ正規表現で解釈する）"""
+        return parse_datetime(value)
+
+    def _column_converters(self) -> List[Tuple[str, Optional[Callable[[Any], Any]]]]:
+        """CONTACTS_COLUMNSの各カラムに適用する変換関数の一覧（textはNone）
+
+        ownerの対応表はHubSpotが返す文字列のIDをキーにしているため、
+        dict.getをそのまま変換関数として使う（None・空文字はNoneになる）
+        """
+        converters = {
+            "text": None,
+            "email": _email_or_empty,
+            "select": self._convert_select_property,
+            "datetime": self._parse_datetime,
+            "owner": self._owner_map.get,
+            "float": parse_float
+        }
+        return [(column, converters[kind]) for column, kind in CONTACTS_COLUMNS]
+
+    async def sync(self, full_sync: bool = False) -> bool:
+        """データ同期を実行（ownerがNULLの連絡先は同期ごとに読み込み直す）"""
+        self._missing_owner = None
+        return await super().sync(full_sync)
+
+    async def _load_missing_owner(self, conn) -> Dict[str, Tuple[str, ...]]:
+        """ownerのカラムがNULLの連絡先と、そのカラムの一覧を取得"""
+        missing_owner = {}
         try:
-            async with DatabaseConnection.get_cursor() as (cursor, conn):
-                await cursor.execute(
-                    "SELECT id FROM owners WHERE hubspot_id = %s",
-                    (str(hubspot_owner_id),)
+            # 件数が多いためサーバー側カーソルで読みながら対応表を作る
+            async for row in self._stream_rows(conn, CONTACTS_MISSING_OWNER_SQL):
+                missing_owner[str(row["hubspot_id"])] = tuple(
+                    column for column in CONTACTS_OWNER_COLUMNS if row[column]
                 )
-                result = await cursor.fetchone()
-                if result:
-                    return result.get("id")
-                return None
         except Exception as e:
-            logger.warning(f"Owner ID取得エラー (hubspot_id: {hubspot_owner_id}): {str(e)}")
-            return None
+            logger.warning(f"ownerが未設定のContact一覧の取得エラー: {str(e)}")
+        return missing_owner
 
     async def save_to_db(self, records: List[Dict[str, Any]]) -> int:
-        """データベースに保存"""
-        saved_count = 0
+        """データベースに保存（executemanyによる一括保存）"""
         total = len(records)
         logger.info(f"データベースへの保存を開始します（全{total}件）")
-
-        async with DatabaseConnection.get_cursor() as (cursor, conn):
+        now = datetime.now()
+
+        async with self._cursor() as (cursor, conn):
+            # ownerの対応表を取得（行ごとにownersを検索しない）
+            self._owner_map = await self._get_owner_map(cursor)
+            skip_before = None
+            if self.modified_since is not None:
+                if self._missing_owner is None:
+                    self._missing_owner = await self._load_missing_owner(conn)
+                skip_before = self.modified_since.timestamp()
+            missing_owner = (self._missing_owner or {}).get
+
+            # 保存する行を先に組み立て、executemanyでまとめて送信する
+            converters = self._column_converters()
+            rows = []
+            skipped = 0
             for idx, contact in enumerate(records, 1):
                 if idx % 100 == 0 or idx == total:
                     percentage = (idx / total * 100) if total > 0 else 0
-                    logger.info(f"保存進捗: {idx}/{total}件 ({percentage:.1f}%)")
+                    logger.info(f"保存準備: {idx}/{total}件 ({percentage:.1f}%)")
+                get = (contact.get("properties") or {}).get
+                # 前回の同期以降HubSpotで更新されていない連絡先は変換しない
+                # （ownerがNULLのカラムにHubSpotが値を返す場合は、ownerの同期後に埋められるよう変換し直す）
+                if skip_before is not None:
+                    updated = parse_epoch_seconds(contact.get("updatedAt"))
+                    if (
+                        updated is not None
+                        and updated < skip_before
+                        and not any(get(column) for column in missing_owner(str(contact.get("id")), ()))
+                    ):
+                        skipped += 1
+                        continue
                 try:
-                    hubspot_id = contact.get("id")
-                    properties = contact.get("properties", {})
-
-                    # 基本情報
-                    lastname = properties.get("lastname")
-                    firstname = properties.get("firstname")
-                    email = properties.get("email") or ""  # emailはNOT NULLなので空文字列を設定
-                    phone = properties.get("phone")
-                    phone2 = properties.get("phone2")
-                    
-                    # 選択式プロパティ（JSON配列に変換）
-                    contact_state = self._convert_select_property(properties.get("contact_state"))
-                    contact_city = properties.get("contact_city")
-                    became_a_partner_date = self._parse_datetime(properties.get("became_a_partner_date"))
-                    contractor_memo = properties.get("contractor_memo")
-                    contractor_channel = self._convert_select_property(properties.get("contractor_channel"))
-                    contractor_last_url_click = self._parse_datetime(properties.get("contractor_last_url_click"))
-                    
-                    # Owner IDの解決
-                    hubspot_owner_id_str = properties.get("hubspot_owner_id")
-                    hubspot_owner_id = await self._get_owner_id(hubspot_owner_id_str) if hubspot_owner_id_str else None
-                    hubspot_old_owner_id_str = properties.get("hubspot_old_owner_id")
-                    hubspot_old_owner_id = await self._get_owner_id(hubspot_old_owner_id_str) if hubspot_old_owner_id_str else None
-                    contact_sales_outbound_str = properties.get("contact_sales_outbound")
-                    contact_sales_outbound = await self._get_owner_id(contact_sales_outbound_str) if contact_sales_outbound_str else None
-                    
-                    # その他の選択式プロパティ
-                    contractor_follow_rank = self._convert_select_property(properties.get("contractor_follow_rank"))
-                    contractor_buy_phase = self._convert_select_property(properties.get("contractor_buy_phase"))
-                    contractor_buy_phase_date = self._parse_datetime(properties.get("contractor_buy_phase_date"))
-                    contractor_sell_phase = self._convert_select_property(properties.get("contractor_sell_phase"))
-                    contractor_sell_phase_date = self._parse_datetime(properties.get("contractor_sell_phase_date"))
-                    contractor_industry = self._convert_select_property(properties.get("contractor_industry"))
-                    contractor_property_type = self._convert_select_property(properties.get("contractor_property_type"))
-                    contractor_buy_or_sell = self._convert_select_property(properties.get("contractor_buy_or_sell"))
-                    contractor_ap = self._convert_select_property(properties.get("contractor_ap"))
-                    contractor_type = self._convert_select_property(properties.get("contractor_type"))
-                    affiliation = self._convert_select_property(properties.get("affiliation"))
-                    graduate_experience = self._convert_select_property(properties.get("graduate_experience"))
-                    contractor_broker = self._convert_select_property(properties.get("contractor_broker"))
-                    information_acquisition_route = self._convert_select_property(properties.get("information_acquisition_route"))
-                    property_information_share = self._convert_select_property(properties.get("property_information_share"))
-                    contractor_area = self._convert_select_property(properties.get("contractor_area"))
-                    contractor_area_category = self._convert_select_property(properties.get("contractor_area_category"))
-                    contractor_gross2 = self._convert_select_property(properties.get("contractor_gross2"))
-                    assessment_community = self._convert_select_property(properties.get("assessment_community"))
-                    assessment_community_detail = properties.get("assessment_community_detail")
-                    increase_referrals = self._convert_select_property(properties.get("increase_referrals"))
-                    ap_number = self._convert_select_property(properties.get("ap_number"))
-                    ap_achievement = self._convert_select_property(properties.get("ap_achievement"))
-                    information_matchmaking = self._convert_select_property(properties.get("information_matchmaking"))
-                    personal_sales = self._convert_select_property(properties.get("personal_sales"))
-                    santame = self._convert_select_property(properties.get("santame"))
-                    ap_conditions = self._convert_select_property(properties.get("ap_conditions"))
-                    decision_flow = self._convert_select_property(properties.get("decision_flow"))
-                    contact_service_area = self._convert_select_property(properties.get("contact_service_area"))
-                    contact_area_details = properties.get("contact_area_details")
-                    contact_sales_gross = self._convert_select_property(properties.get("contact_sales_gross"))
-                    contact_own_funds = self._convert_select_property(properties.get("contact_own_funds"))
-                    contractor_yield = properties.get("contractor_yield")
-                    contact_yield = self._convert_select_property(properties.get("contact_yield"))
-                    contractor_bank = self._convert_select_property(properties.get("contractor_bank"))
-                    contact_station_distance = self._convert_select_property(properties.get("contact_station_distance"))
-                    contact_building_age = self._convert_select_property(properties.get("contact_building_age"))
-                    contact_building_structure = self._convert_select_property(properties.get("contact_building_structure"))
-                    contact_supplement = properties.get("contact_supplement")
-                    
-                    # associatedcompanyid
-                    associatedcompanyid = None
-                    associatedcompanyid_str = properties.get("associatedcompanyid")
-                    if associatedcompanyid_str:
-                        try:
-                            associatedcompanyid = float(associatedcompanyid_str)
-                        except:
-                            pass
-
-                    await cursor.execute(
-                        """
-                        INSERT INTO contacts 
-                        (hubspot_id, lastname, firstname, email, phone, phone2, contact_state, contact_city,
-                         became_a_partner_date, contractor_memo, contractor_channel, contractor_last_url_click,
-                         hubspot_owner_id, hubspot_old_owner_id, contact_sales_outbound, contractor_follow_rank,
-                         contractor_buy_phase, contractor_buy_phase_date, contractor_sell_phase, contractor_sell_phase_date,
-                         contractor_industry, contractor_property_type, contractor_buy_or_sell, contractor_ap,
-                         contractor_type, affiliation, graduate_experience, contractor_broker, information_acquisition_route,
-                         property_information_share, contractor_area, contractor_area_category, contractor_gross2,
-                         assessment_community, assessment_community_detail, increase_referrals, ap_number, ap_achievement,
-                         information_matchmaking, personal_sales, santame, ap_conditions, decision_flow,
-                         contact_service_area, contact_area_details, contact_sales_gross, contact_own_funds,
-                         contractor_yield, contact_yield, contractor_bank, contact_station_distance, contact_building_age,
-                         contact_building_structure, contact_supplement, associatedcompanyid, last_synced_at)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
-                        ON DUPLICATE KEY UPDATE
-                            lastname = VALUES(lastname),
-                            firstname = VALUES(firstname),
-                            email = VALUES(email),
-                            phone = VALUES(phone),
-                            phone2 = VALUES(phone2),
-                            contact_state = VALUES(contact_state),
-                            contact_city = VALUES(contact_city),
-                            became_a_partner_date = VALUES(became_a_partner_date),
-                            contractor_memo = VALUES(contractor_memo),
-                            contractor_channel = VALUES(contractor_channel),
-                            contractor_last_url_click = VALUES(contractor_last_url_click),
-                            hubspot_owner_id = VALUES(hubspot_owner_id),
-                            hubspot_old_owner_id = VALUES(hubspot_old_owner_id),
-                            contact_sales_outbound = VALUES(contact_sales_outbound),
-                            contractor_follow_rank = VALUES(contractor_follow_rank),
-                            contractor_buy_phase = VALUES(contractor_buy_phase),
-                            contractor_buy_phase_date = VALUES(contractor_buy_phase_date),
-                            contractor_sell_phase = VALUES(contractor_sell_phase),
-                            contractor_sell_phase_date = VALUES(contractor_sell_phase_date),
-                            contractor_industry = VALUES(contractor_industry),
-                            contractor_property_type = VALUES(contractor_property_type),
-                            contractor_buy_or_sell = VALUES(contractor_buy_or_sell),
-                            contractor_ap = VALUES(contractor_ap),
-                            contractor_type = VALUES(contractor_type),
-                            affiliation = VALUES(affiliation),
-                            graduate_experience = VALUES(graduate_experience),
-                            contractor_broker = VALUES(contractor_broker),
-                            information_acquisition_route = VALUES(information_acquisition_route),
-                            property_information_share = VALUES(property_information_share),
-                            contractor_area = VALUES(contractor_area),
-                            contractor_area_category = VALUES(contractor_area_category),
-                            contractor_gross2 = VALUES(contractor_gross2),
-                            assessment_community = VALUES(assessment_community),
-                            assessment_community_detail = VALUES(assessment_community_detail),
-                            increase_referrals = VALUES(increase_referrals),
-                            ap_number = VALUES(ap_number),
-                            ap_achievement = VALUES(ap_achievement),
-                            information_matchmaking = VALUES(information_matchmaking),
-                            personal_sales = VALUES(personal_sales),
-                            santame = VALUES(santame),
-                            ap_conditions = VALUES(ap_conditions),
-                            decision_flow = VALUES(decision_flow),
-                            contact_service_area = VALUES(contact_service_area),
-                            contact_area_details = VALUES(contact_area_details),
-                            contact_sales_gross = VALUES(contact_sales_gross),
-                            contact_own_funds = VALUES(contact_own_funds),
-                            contractor_yield = VALUES(contractor_yield),
-                            contact_yield = VALUES(contact_yield),
-                            contractor_bank = VALUES(contractor_bank),
-                            contact_station_distance = VALUES(contact_station_distance),
-                            contact_building_age = VALUES(contact_building_age),
-                            contact_building_structure = VALUES(contact_building_structure),
-                            contact_supplement = VALUES(contact_supplement),
-                            associatedcompanyid = VALUES(associatedcompanyid),
-                            last_synced_at = NOW(),
-                            updated_at = NOW()
-                        """,
-                        (
-                            hubspot_id, lastname, firstname, email, phone, phone2, contact_state, contact_city,
-                            became_a_partner_date, contractor_memo, contractor_channel, contractor_last_url_click,
-                            hubspot_owner_id, hubspot_old_owner_id, contact_sales_outbound, contractor_follow_rank,
-                            contractor_buy_phase, contractor_buy_phase_date, contractor_sell_phase, contractor_sell_phase_date,
-                            contractor_industry, contractor_property_type, contractor_buy_or_sell, contractor_ap,
-                            contractor_type, affiliation, graduate_experience, contractor_broker, information_acquisition_route,
-                            property_information_share, contractor_area, contractor_area_category, contractor_gross2,
-                            assessment_community, assessment_community_detail, increase_referrals, ap_number, ap_achievement,
-                            information_matchmaking, personal_sales, santame, ap_conditions, decision_flow,
-                            contact_service_area, contact_area_details, contact_sales_gross, contact_own_funds,
-                            contractor_yield, contact_yield, contractor_bank, contact_station_distance, contact_building_age,
-                            contact_building_structure, contact_supplement, associatedcompanyid
-                        )
+                    values = (contact.get("id"),) + tuple(
+                        get(column) if convert is None else convert(get(column))
+                        for column, convert in converters
                     )
-                    saved_count += 1
-
+                    rows.append(values + (content_hash(values), now))
                 except Exception as e:
                     logger.error(f"Contact保存エラー (hubspot_id: {contact.get('id')}): {str(e)}")
-                    continue
 
-            await conn.commit()
+        # 複数の接続で並行して保存する（各接続はチャンクごとにコミット）
+        saved_count = await self._executemany_concurrently(CONTACTS_INSERT_SQL, rows)
+        if skipped:
+            # 保存を省いた連絡先は保存件数に含めず、別に数える
+            self._skipped_count += skipped
+            logger.info(f"HubSpotで更新されていない{skipped}件の保存を省きました")
 
         return saved_count
-
@@ -0,0 +1,132 @@
+"""
+同期処理で共通利用する値変換ユーティリティ
+"""
+import hashlib
+import re
+from functools import lru_cache
+from typing import Any, Optional
+from datetime import datetime
+
+# 文字列の変換結果をキャッシュする件数（選択値や日付は同じ値が繰り返し現れる）
+CONVERT_CACHE_SIZE = 8192
+
+# orjsonがあればJSONカラムへの変換に使用（メール本文などの大きなmetadataはstdlib jsonだと遅い）
+try:
+    import orjson
+
+    def to_json(value: Any) -> str:
+        """値をJSON文字列に変換（JSONカラムに渡すためbytesではなくstrで返す）"""
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+except ImportError:
+    import json
+
+    def to_json(value: Any) -> str:
+        """値をJSON文字列に変換"""
+        return json.dumps(value)
+
+
+
+def convert_select_property(value: Any) -> Optional[str]:
+    """
+    選択式プロパティをJSON配列形式に変換
+
+    リストはそのまま、セミコロン区切りの文字列は配列に分割し、それ以外は単一値の配列にする。
+    """
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return to_json(value)
+    if isinstance(value, str):
+        return _convert_select_string(value)
+    return to_json([str(value)])
+
+
+@lru_cache(maxsize=CONVERT_CACHE_SIZE)
+def _convert_select_string(value: str) -> Optional[str]:
+    """選択式プロパティの文字列をJSON配列形式に変換（同じ選択値が繰り返し現れるためキャッシュする）"""
+    if ";" in value:
+        values = [v.strip() for v in value.split(";") if v.strip()]
+        return to_json(values) if values else None
+    # エスケープが不要な単一値（大半の選択値）はJSONエンコーダーを使わずに組み立てる
+    if '"' not in value and "\\" not in value and value.isprintable():
+        return f'["{value}"]'
+    return to_json([value])
+
+
+def parse_float(value: Any) -> Optional[float]:
+    """数値文字列をfloatに変換（空文字列や変換できない値はNone）"""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def content_hash(values: tuple) -> str:
+    """保存する値のタプルから変更検知用のハッシュ（32文字の16進数）を計算"""
+    return hashlib.blake2b(repr(values).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def parse_epoch_seconds(value: Any) -> Optional[float]:
+    """HubSpotのUTC日時文字列（例: 2024-01-01T00:00:00.000Z）をUNIX時刻（秒）に変換"""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+# fromisoformatで解釈できない場合のフォールバック（日付、または日付と時刻・1〜6桁の小数秒・末尾のZ）
+DATETIME_PATTERN = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})(?:[ T](\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?Z?)?\Z", re.ASCII
+)
+
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """
+    日時をdatetimeに変換
+
+    数値はミリ秒のエポック時刻として扱う。文字列は末尾のZを除いてfromisoformatで解釈し、
+    失敗した場合（Python 3.9で小数秒が3桁・6桁以外など）のみDATETIME_PATTERNで解釈する。
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(value / 1000)
+        except (OverflowError, OSError, ValueError):
+            return None
+    if isinstance(value, str):
+        return _parse_datetime_string(value)
+    return None
+
+
+@lru_cache(maxsize=CONVERT_CACHE_SIZE)
+def _parse_datetime_string(value: str) -> Optional[datetime]:
+    """日時文字列をdatetimeに変換（日付のみの値などは繰り返し現れるためキャッシュする）"""
+    text = value[:-1] if value.endswith("Z") else value
+    try:
+        parsed = datetime.fromisoformat(text)
+        # タイムゾーン付きの値は従来どおり扱わない
+        if parsed.tzinfo is None:
+            return parsed
+    except ValueError:
+        pass
+    # 正規表現1回で各要素を取り出し、strptimeを使わずにdatetimeを組み立てる
+    match = DATETIME_PATTERN.match(value)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, fraction = match.groups()
+    try:
+        if hour is None:
+            return datetime(int(year), int(month), int(day))
+        return datetime(
+            int(year), int(month), int(day), int(hour), int(minute), int(second),
+            int(fraction.ljust(6, "0")) if fraction else 0
+        )
+    except ValueError:
+        return None
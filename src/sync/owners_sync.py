@@ -5,11 +5,16 @@ import logging
 from typing import Dict, Any, List
 from datetime import datetime
 
-from src.sync.base_sync import BaseSync
-from src.database.connection import DatabaseConnection
+from src.sync.base_sync import BaseSync, build_upsert_sql
 
 logger = logging.getLogger(__name__)
 
+# VALUESは%sのみで構成されるため、executemanyで複数行INSERTに書き換えられる
+OWNERS_INSERT_SQL = build_upsert_sql(
+    "owners",
+    ["hubspot_id", "email", "firstname", "lastname", "userId", "createdAt", "updatedAt", "archived", "teams"]
+)
+
 
 class OwnersSync(BaseSync):
     """Owners同期クラス"""
@@ -33,10 +38,12 @@ class OwnersSync(BaseSync):
         return owners
 
     async def save_to_db(self, records: List[Dict[str, Any]]) -> int:
-        """データベースに保存"""
-        saved_count = 0
+        """データベースに保存（executemanyによる一括保存）"""
+        now = datetime.now()
 
-        async with DatabaseConnection.get_cursor() as (cursor, conn):
+        async with self._cursor() as (cursor, conn):
+            # 保存する行を先に組み立て、executemanyでまとめて送信する
+            rows = []
             for owner in records:
                 try:
                     hubspot_id = str(owner.get("id", ""))
@@ -64,42 +71,27 @@ class OwnersSync(BaseSync):
                         except:
                             pass
 
-                    await cursor.execute(
-                        """
-                        INSERT INTO owners 
-                        (hubspot_id, email, firstname, lastname, userId, createdAt, updatedAt, archived, teams, last_synced_at)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
-                        ON DUPLICATE KEY UPDATE
-                            email = VALUES(email),
-                            firstname = VALUES(firstname),
-                            lastname = VALUES(lastname),
-                            userId = VALUES(userId),
-                            createdAt = VALUES(createdAt),
-                            updatedAt = VALUES(updatedAt),
-                            archived = VALUES(archived),
-                            teams = VALUES(teams),
-                            last_synced_at = NOW(),
-                            updated_at = NOW()
-                        """,
-                        (
-                            hubspot_id,
-                            email,
-                            firstname,
-                            lastname,
-                            user_id,
-                            created_at_dt,
-                            updated_at_dt,
-                            archived,
-                            teams
-                        )
-                    )
-                    saved_count += 1
+                    rows.append((
+                        hubspot_id,
+                        email,
+                        firstname,
+                        lastname,
+                        user_id,
+                        created_at_dt,
+                        updated_at_dt,
+                        archived,
+                        teams,
+                        now
+                    ))
 
                 except Exception as e:
                     logger.error(f"Owner保存エラー (hubspot_id: {owner.get('id')}): {str(e)}")
                     continue
 
-            await conn.commit()
+            saved_count = await self._executemany_chunked(cursor, OWNERS_INSERT_SQL, rows, conn=conn)
+
+        # 他の同期が古いowner対応表を使わないようにキャッシュを破棄
+        self.invalidate_owner_cache()
 
         return saved_count
 
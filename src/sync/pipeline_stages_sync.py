@@ -6,7 +6,6 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from src.sync.base_sync import BaseSync
-from src.database.connection import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +13,18 @@ logger = logging.getLogger(__name__)
 PURCHASE_PIPELINE_ID = "675713658"
 SALES_PIPELINE_ID = "682910274"
 
+# VALUESは%sのみで構成されるため、executemanyで複数行INSERTに書き換えられる
+PIPELINE_STAGES_INSERT_SQL = """
+    INSERT INTO pipeline_stages
+    (pipeline_id, hubspot_stage_id, label, display_order, probability, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        label = VALUES(label),
+        display_order = VALUES(display_order),
+        probability = VALUES(probability),
+        updated_at = VALUES(updated_at)
+"""
+
 
 class PipelineStagesSync(BaseSync):
     """Pipeline Stages同期クラス"""
@@ -56,8 +67,9 @@ class PipelineStagesSync(BaseSync):
     async def save_to_db(self, records: List[Dict[str, Any]]) -> int:
         """データベースに保存"""
         saved_count = 0
+        now = datetime.now()
 
-        async with DatabaseConnection.get_cursor() as (cursor, conn):
+        async with self._cursor() as (cursor, conn):
             for pipeline_data in records:
                 try:
                     hubspot_id = pipeline_data.get("hubspot_id")
@@ -93,7 +105,8 @@ class PipelineStagesSync(BaseSync):
                     
                     pipeline_id = pipeline_result.get("id")
                     
-                    # ステージを保存または更新
+                    # ステージをまとめて保存または更新（executemanyで複数行INSERTとして送信）
+                    stage_rows = []
                     for stage in stages:
                         hubspot_stage_id = stage.get("id")
                         stage_label = stage.get("label", "")
@@ -103,22 +116,13 @@ class PipelineStagesSync(BaseSync):
                         if not hubspot_stage_id:
                             continue
                         
-                        await cursor.execute(
-                            """
-                            INSERT INTO pipeline_stages 
-                            (pipeline_id, hubspot_stage_id, label, display_order, probability, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, NOW())
-                            ON DUPLICATE KEY UPDATE
-                                label = VALUES(label),
-                                display_order = VALUES(display_order),
-                                probability = VALUES(probability),
-                                updated_at = NOW()
-                            """,
-                            (pipeline_id, hubspot_stage_id, stage_label, display_order, probability)
-                        )
-                        saved_count += 1
+                        stage_rows.append((pipeline_id, hubspot_stage_id, stage_label, display_order, probability, now))
+
+                    if stage_rows:
+                        await cursor.executemany(PIPELINE_STAGES_INSERT_SQL, stage_rows)
                     
                     await conn.commit()
+                    saved_count += len(stage_rows)
                     logger.info(f"パイプライン {label} ({len(stages)}ステージ) を保存しました")
                     
                 except Exception as e:
@@ -6,7 +6,6 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from src.sync.base_sync import BaseSync
-from src.database.connection import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
@@ -93,7 +92,7 @@ class PropertiesSync(BaseSync):
         total = len(records)
         logger.info(f"データベースへの保存を開始します（全{total}件）")
 
-        async with DatabaseConnection.get_cursor() as (cursor, conn):
+        async with self._cursor() as (cursor, conn):
             for idx, property_obj in enumerate(records, 1):
                 if idx % 100 == 0 or idx == total:
                     percentage = (idx / total * 100) if total > 0 else 0
@@ -0,0 +1,32 @@
+"""
+ChatService._should_search_vector_db の判定テスト
+"""
+import pytest
+
+# ChatServiceはollama・DBドライバーに依存するため、ない環境ではスキップする
+pytest.importorskip("ollama")
+
+from src.chat.service import ChatService
+
+
+@pytest.fixture
+def service():
+    # 判定はインスタンスの状態を使わないため、__init__（Ollama・DBの初期化）を通さずに作成する
+    return ChatService.__new__(ChatService)
+
+
+@pytest.mark.parametrize("message", [
+    "すみません、今月の仕入の件数を教えてください",
+    "お疲れ様です。田中さんの担当物件の一覧を出して",
+])
+def test_polite_prefix_does_not_skip_data_question(service, message):
+    assert service._should_search_vector_db(message) is True
+
+
+# 10文字以上のため、長さによる判定ではなく定型文の判定でスキップされることを確認する
+@pytest.mark.parametrize("message", [
+    "ありがとうございます！助かりました",
+    "お疲れ様です。ありがとうございました",
+])
+def test_filler_only_message_skips_search(service, message):
+    assert service._should_search_vector_db(message) is False